@@ -21,20 +21,11 @@ python -m pip install -r requirements.txt
 # Install Gunicorn if not present
 python -m pip install gunicorn
 
-# Create gunicorn config
-cat > gunicorn.conf.py << EOL
-bind = "0.0.0.0:${PORT}"
-workers = 4
-threads = 2
-timeout = 600
-keepalive = 5
-worker_class = "sync"
-loglevel = "info"
-accesslog = "-"
-errorlog = "-"
-capture_output = True
-enable_stdio_inheritance = True
-EOL
+# Gunicorn sizing defaults; gunicorn.conf.py also reads overrides from RT_SEARCH_SETTINGS_FILE
+export GUNICORN_WORKERS=${GUNICORN_WORKERS:-4}
+export GUNICORN_THREADS=${GUNICORN_THREADS:-2}
+export GUNICORN_TIMEOUT=${GUNICORN_TIMEOUT:-600}
+export GUNICORN_KEEPALIVE=${GUNICORN_KEEPALIVE:-5}
 
 # Start Gunicorn
 echo "Starting Gunicorn on port ${PORT}..."
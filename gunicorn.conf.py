@@ -1,10 +1,16 @@
 import multiprocessing
+import os
 
-bind = "0.0.0.0:8000"
-workers = multiprocessing.cpu_count() * 2 + 1
-threads = 2
-timeout = 300
-keepalive = 2
+from rt_search.config import load_setting
+
+# Worker sizing comes from the settings file (RT_SEARCH_SETTINGS_FILE) or GUNICORN_* variables.
+# Gunicorn re-reads this file on SIGHUP, so editing the settings file and sending SIGHUP to the
+# master applies new values with a graceful worker restart.
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = load_setting("gunicorn_workers") or multiprocessing.cpu_count() * 2 + 1
+threads = load_setting("gunicorn_threads")
+timeout = load_setting("gunicorn_timeout")
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 2))
 worker_class = "sync"
 loglevel = "info"
 accesslog = "-"
@@ -1,5 +1,23 @@
-"""Package initialization."""
-from .search_client import SearchClient
-from .env_loader import load_env
+"""Package initialization.
+
+Public names are imported on first access so that ``import rt_search`` stays
+cheap; the Azure and OpenAI client libraries load only when a client is used.
+"""
+import importlib
+
+_LAZY_ATTRS = {
+    'SearchClient': '.search_client',
+    'load_env': '.env_loader'
+}
 
 __all__ = ['SearchClient', 'load_env']
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
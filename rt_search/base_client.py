@@ -1,11 +1,18 @@
 """Base client for Azure Cognitive Search."""
 import json
 import logging
+import threading
+import time
+from typing import Optional
 
 import requests
 
 logger = logging.getLogger(__name__)
 
+# Seconds between retries of a failed schema inspection, doubling up to the maximum
+SCHEMA_RETRY_DELAY = 5
+SCHEMA_RETRY_MAX_DELAY = 60
+
 class BaseSearchClient:
     """Base client with core functionality."""
     
@@ -23,11 +30,48 @@ class BaseSearchClient:
         self._api_version = '2023-07-01-Preview'
         self.search_url = f'{self._endpoint}/indexes/{self._index_name}/docs/search?api-version={self._api_version}'
         
-        # Initialize by inspecting index
-        self.inspect_index()
+        # Inspect the index in the background so construction does no network I/O
+        self.schema_error: Optional[str] = None
+        self._schema_attempted = threading.Event()
+        self._schema_thread = threading.Thread(
+            target=self._inspect_until_ready,
+            name=f'inspect-{self._index_name}',
+            daemon=True
+        )
+        self._schema_thread.start()
+    
+    @property
+    def schema_ready(self) -> bool:
+        """Whether the index schema has been inspected successfully."""
+        return self._schema_attempted.is_set() and self.schema_error is None
+    
+    def wait_for_schema(self, timeout: float = None) -> bool:
+        """Block until the first index schema inspection has finished.
+        
+        The inspection may have failed; check ``schema_error``.
+        
+        Returns:
+            bool: False if the timeout expired first
+        """
+        return self._schema_attempted.wait(timeout)
+    
+    def _inspect_until_ready(self):
+        """Inspect the index, retrying with backoff until it succeeds."""
+        delay = SCHEMA_RETRY_DELAY
+        while True:
+            self.inspect_index()
+            self._schema_attempted.set()
+            if self.schema_error is None:
+                return
+            logger.warning(f'Retrying inspection of index {self._index_name} in {delay} s')
+            time.sleep(delay)
+            delay = min(delay * 2, SCHEMA_RETRY_MAX_DELAY)
     
     def inspect_index(self):
-        """Inspect the search index to understand its schema."""
+        """Inspect the search index to understand its schema.
+        
+        Sets ``schema_error`` to a description of the failure, or None on success.
+        """
         try:
             # Get index definition
             index_url = f"{self._endpoint}/indexes/{self._index_name}?api-version={self._api_version}"
@@ -69,6 +113,14 @@ class BaseSearchClient:
                 # Store field information for later use
                 self.searchable_fields = [f['name'] for f in fields if f.get('searchable', False)]
                 self.retrievable_fields = [f['name'] for f in fields if f.get('retrievable', False)]
+                key = next((f for f in fields if f.get('key', False)), None)
+                self.key_field = key['name'] if key else None
+                # Key-range paging needs to sort and filter on the key
+                self.key_pageable = bool(key and key.get('sortable', False) and key.get('filterable', False))
+                self.text_fields = [
+                    f['name'] for f in fields
+                    if f.get('searchable', False) and f.get('type') in ('Edm.String', 'Collection(Edm.String)')
+                ]
                 
                 # Log available fields
                 print('\nSearchable fields:', self.searchable_fields)
@@ -79,10 +131,13 @@ class BaseSearchClient:
                 # Print raw index definition for debugging
                 print('\nRaw index definition:')
                 print(json.dumps(index_def, indent=2))
+                self.schema_error = None
                 
             else:
                 logger.error(f'Failed to get index definition: {response.status_code}')
                 logger.error(f'Response: {response.text}')
+                self.schema_error = f'Index {self._index_name} definition request failed with status {response.status_code}'
                 
         except Exception as e:
             logger.error(f'Error inspecting index: {str(e)}')
+            self.schema_error = f'Index {self._index_name} inspection failed: {str(e)}'
@@ -0,0 +1,202 @@
+"""Run a checklist of clause queries against the index from the command line.
+
+Queries are read one per line from a file or stdin, either as plain text or as
+JSON objects with ``query`` and an optional ``id``. Results are appended to a
+JSONL file as each query finishes, so an interrupted run can be resumed.
+
+Usage:
+    python -m rt_search.bulk_search checklist.txt -o results.jsonl --concurrency 4 --no-summary
+    python -m rt_search.bulk_search checklist.txt -o results.jsonl --resume
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, IO, Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+def read_queries(stream: IO[str]) -> Iterator[Tuple[str, str]]:
+    """Yield (id, query) pairs, numbering plain-text lines by line number."""
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('{'):
+            try:
+                item = json.loads(line)
+            except ValueError:
+                logger.warning(f'Skipping malformed JSON on line {line_no}')
+                continue
+            query = str(item.get('query', '')).strip()
+            if query:
+                yield str(item.get('id', line_no)), query
+        else:
+            yield str(line_no), line
+
+def completed_ids(path: str) -> Set[Tuple[str, str]]:
+    """(id, query) pairs already written without an error, for resuming a run.
+
+    Plain-text ids are line numbers, so the query is part of the match: after
+    the checklist is edited, a line that moved is run again rather than a
+    different query being skipped.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'error' not in record:
+                done.add((str(record.get('id')), str(record.get('query', ''))))
+    return done
+
+def _prepare_output(path: str, resume: bool) -> IO[str]:
+    """Open the output file, making sure appended records start on a new line."""
+    if resume and os.path.exists(path) and os.path.getsize(path):
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+        out = open(path, 'a', encoding='utf-8')
+        if needs_newline:
+            out.write('\n')
+        return out
+    return open(path, 'w', encoding='utf-8')
+
+class Throughput:
+    """Progress counters with periodic reporting to stderr."""
+
+    def __init__(self, interval: float = 10.0):
+        self.interval = interval
+        self.start = time.monotonic()
+        self.last_report = self.start
+        self.done = 0
+        self.errors = 0
+        self.skipped = 0
+        self.latencies = []
+
+    def add(self, latency_ms: float, error: bool):
+        self.done += 1
+        self.errors += error
+        self.latencies.append(latency_ms)
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            print(self.summary(), file=sys.stderr, flush=True)
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        latencies = sorted(self.latencies)
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        return (f'{self.done} queries ({self.errors} errors, {self.skipped} skipped) in {elapsed:.1f} s, '
+                f'{rate:.2f} q/s, latency p50 {p50:.0f} ms p95 {p95:.0f} ms')
+
+def run_query(client, query_id: str, query: str, summarize: bool,
+              group: Optional[bool] = None, chunk_content: bool = False) -> Tuple[Dict, float]:
+    """Run one query and build its output record.
+
+    Failed searches and, when summaries are requested, empty summaries are
+    written as ``error`` records so that ``--resume`` retries them.
+    """
+    start = time.perf_counter()
+    try:
+        response = client.search(query, summarize=summarize, group=group)
+        if summarize and len(response) and not response.summary:
+            raise RuntimeError('Summary generation failed')
+        record = {'id': query_id, 'query': query}
+        record.update(response.to_envelope(chunk_content))
+    except Exception as e:
+        logger.error(f'Query {query_id} failed: {str(e)}')
+        record = {'id': query_id, 'query': query, 'error': str(e)}
+    return record, (time.perf_counter() - start) * 1000
+
+def run(client, queries: Iterator[Tuple[str, str]], out: IO[str], concurrency: int = 4,
+        summarize: bool = True, skip: Set[Tuple[str, str]] = frozenset(), report_interval: float = 10.0,
+        group: Optional[bool] = None, chunk_content: bool = False) -> Throughput:
+    """Run queries with bounded concurrency, writing each record as it completes."""
+    progress = Throughput(report_interval)
+    max_pending = concurrency * 2
+    pending = set()
+
+    def drain(return_when):
+        finished, still_pending = wait(pending, return_when=return_when)
+        for future in finished:
+            record, latency_ms = future.result()
+            out.write(json.dumps(record, separators=(',', ':')) + '\n')
+            out.flush()
+            progress.add(latency_ms, 'error' in record)
+        return still_pending
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk-search') as executor:
+        for query_id, query in queries:
+            if (query_id, query) in skip:
+                progress.skipped += 1
+                continue
+            # Read input only as fast as queries complete
+            if len(pending) >= max_pending:
+                pending = drain(FIRST_COMPLETED)
+            pending.add(executor.submit(run_query, client, query_id, query, summarize, group, chunk_content))
+        if pending:
+            drain(ALL_COMPLETED)
+    return progress
+
+def main(argv=None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description='Run clause queries in bulk and write results as JSONL.')
+    parser.add_argument('input', nargs='?', default='-', help='Query file, or - for stdin (default)')
+    parser.add_argument('-o', '--output', required=True, help='JSONL file to write results to')
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help='Queries in flight (default 4)')
+    parser.add_argument('--no-summary', action='store_true', help='Skip OpenAI summaries')
+    parser.add_argument('--group', action='store_true', help='Collapse hits by source document')
+    parser.add_argument('--chunk-content', action='store_true',
+                        help='Include full content of grouped chunks instead of snippets')
+    parser.add_argument('--resume', action='store_true',
+                        help='Append to the output, skipping queries already completed')
+    parser.add_argument('--report-interval', type=float, default=10.0,
+                        help='Seconds between progress reports on stderr')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    from .env_loader import load_env
+    from .search_client import SearchClient
+
+    load_env()
+    client = SearchClient()
+
+    skip = completed_ids(args.output) if args.resume else set()
+    if skip:
+        print(f'Resuming: {len(skip)} queries already completed', file=sys.stderr)
+
+    stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    try:
+        with _prepare_output(args.output, args.resume) as out:
+            progress = run(
+                client, read_queries(stream), out,
+                concurrency=max(1, args.concurrency),
+                summarize=not args.no_summary,
+                skip=skip,
+                report_interval=args.report_interval,
+                group=True if args.group else None,
+                chunk_content=args.chunk_content
+            )
+    except KeyboardInterrupt:
+        print('Interrupted; rerun with --resume to continue', file=sys.stderr)
+        return 130
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    print(progress.summary(), file=sys.stderr)
+    return 1 if progress.errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""TTL caches for search responses."""
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1000):
+        """Initialize the cache.
+
+        Args:
+            max_entries (int): Least recently used entries are evicted beyond this size
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        """Store a value for ``ttl`` seconds."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def resize(self, max_entries: int):
+        """Change the size limit, evicting least recently used entries beyond it."""
+        with self._lock:
+            self.max_entries = max_entries
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def ttl_remaining(self, key: Hashable) -> float:
+        """Seconds until the entry expires; 0 if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return 0.0
+        return max(0.0, entry[1] - time.monotonic())
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+class SharedCache:
+    """Cache entries shared between the worker processes on one host.
+
+    Each entry is a pickle file named by a hash of its key, holding the value
+    and its wall-clock expiry. Files are replaced atomically, so readers never
+    see a partial entry. Used to hand responses refreshed by the single cache
+    warmer to every worker.
+    """
+
+    def __init__(self, directory: str):
+        """Initialize the cache.
+
+        Args:
+            directory (str): Directory holding the entry files
+        """
+        self.directory = directory
+
+    def _path(self, key: Hashable) -> str:
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.pickle')
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """Return ``(value, ttl_remaining)``, or None if missing or expired."""
+        try:
+            with open(self._path(key), 'rb') as f:
+                stored_key, expires = pickle.load(f)
+                if stored_key != key or expires <= time.time():
+                    return None
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'Unreadable shared cache entry: {str(e)}')
+            return None
+        return value, max(0.0, expires - time.time())
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        """Store a value for ``ttl`` seconds."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                # Header first, so expiry can be read without loading the value
+                pickle.dump((key, time.time() + ttl), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def ttl_remaining(self, key: Hashable) -> float:
+        """Seconds until the entry expires; 0 if it is missing or expired."""
+        try:
+            with open(self._path(key), 'rb') as f:
+                stored_key, expires = pickle.load(f)
+        except Exception:
+            return 0.0
+        if stored_key != key:
+            return 0.0
+        return max(0.0, expires - time.time())
+
+    def prune(self):
+        """Delete expired entry files."""
+        now = time.time()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('.pickle'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'rb') as f:
+                    _, expires = pickle.load(f)
+                if expires <= now:
+                    os.remove(path)
+            except Exception:
+                continue
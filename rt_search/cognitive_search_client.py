@@ -1,9 +1,8 @@
 """Azure Cognitive Search client module."""
 import logging
-import os
-from typing import Dict, List
+from typing import List, Optional
 
-from openai import AzureOpenAI
+from .models import SearchResult
 from .search_operations import SearchOperations
 
 logger = logging.getLogger(__name__)
@@ -17,20 +16,11 @@ class CognitiveSearchClient(SearchOperations):
             index_name (str): Name of the search index
             api_key (str): API key for authentication
         """
-        # Initialize base client
+        # Initialize base client; the index schema is inspected in the background
         super().__init__(endpoint, index_name, api_key)
-        
-        # Initialize OpenAI client
-        logger.info('Initializing OpenAI client...')
-        self.openai_client = AzureOpenAI(
-            api_key=os.getenv('AZURE_OPENAI_API_KEY'),
-            api_version=os.getenv('AZURE_OPENAI_API_VERSION', '2023-05-15'),
-            azure_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT'),
-            default_headers={'User-Agent': 'rt-search/1.0.0'}
-        )
-        logger.info('SearchClient initialization complete')
+        logger.info('CognitiveSearchClient initialization complete')
 
-    def search(self, query: str) -> List[Dict]:
+    def search(self, query: str, top: Optional[int] = None) -> List[SearchResult]:
         """Execute a search query"""
         # Forward to parent class implementation
-        return super().search(query)
+        return super().search(query, top=top)
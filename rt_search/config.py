@@ -1,21 +1,313 @@
-"""Configuration module for Azure Cognitive Search and OpenAI."""
+"""Configuration module for Azure Cognitive Search and OpenAI.
+
+All modules read their configuration from a single :class:`Settings` object
+returned by :func:`get_settings`. It is built once from environment variables,
+optionally overlaid with a JSON file named by ``RT_SEARCH_SETTINGS_FILE``, and can
+be reloaded without restarting workers by editing that file or sending SIGHUP.
+Tunables take effect on the next request; endpoint, credential and index changes
+require a restart because clients are constructed with them.
+"""
+import dataclasses
+import json
+import logging
 import os
-from typing import Dict
+import signal
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from typing import Dict, Optional, Tuple, get_origin
+
+logger = logging.getLogger(__name__)
+
+# Environment variables that must be set for the service to start
+REQUIRED_VARS = {
+    'AZURE_OPENAI_ENDPOINT': 'Azure OpenAI endpoint',
+    'AZURE_OPENAI_DEPLOYMENT': 'Azure OpenAI deployment name',
+    'AZURE_OPENAI_API_KEY': 'Azure OpenAI credential',
+    'AZURE_AI_SEARCH_ENDPOINT': 'Azure AI Search endpoint',
+    'AZURE_AI_SEARCH_INDEX': 'Azure AI Search index name',
+    'AZURE_AI_SEARCH_API_KEY': 'Azure AI Search credential'
+}
+
+# Settings that cannot change without rebuilding clients
+RESTART_REQUIRED = (
+    'openai_endpoint', 'openai_deployment', 'openai_api_key', 'openai_api_version',
+    'search_endpoint', 'search_indexes', 'search_api_key'
+)
+
+def _env(name: str, default=None, required: bool = False, minimum=None, maximum=None,
+         choices: Optional[Tuple] = None) -> dataclasses.Field:
+    """Field metadata naming the environment variable a setting is read from.
+
+    ``minimum``, ``maximum`` and ``choices`` restrict the values accepted when
+    settings are loaded or reloaded.
+    """
+    metadata = {'env': name, 'minimum': minimum, 'maximum': maximum, 'choices': choices}
+    if required:
+        return field(metadata=metadata)
+    return field(default=default, metadata=metadata)
+
+@dataclass(frozen=True)
+class Settings:
+    """Typed service configuration."""
+
+    # Azure OpenAI
+    openai_endpoint: str = _env('AZURE_OPENAI_ENDPOINT', required=True)
+    openai_deployment: str = _env('AZURE_OPENAI_DEPLOYMENT', required=True)
+    openai_api_key: str = _env('AZURE_OPENAI_API_KEY', required=True)
+    # Azure AI Search
+    search_endpoint: str = _env('AZURE_AI_SEARCH_ENDPOINT', required=True)
+    search_indexes: Tuple[str, ...] = _env('AZURE_AI_SEARCH_INDEX', required=True)
+    search_api_key: str = _env('AZURE_AI_SEARCH_API_KEY', required=True)
+    openai_api_version: str = _env('AZURE_OPENAI_API_VERSION', '2024-02-15-preview')
+
+    # Search tunables
+    search_top: int = _env('RT_SEARCH_TOP', 50, minimum=1, maximum=1000)
+    search_minimum_coverage: int = _env('RT_SEARCH_MINIMUM_COVERAGE', 25, minimum=0, maximum=100)
+    search_fuzzy_distance: int = _env('RT_SEARCH_FUZZY_DISTANCE', 1, minimum=0, maximum=2)
+    search_highlight_fields: Tuple[str, ...] = _env('RT_SEARCH_HIGHLIGHT_FIELDS', ('content', 'title'))
+    search_fusion: str = _env('AZURE_AI_SEARCH_FUSION', 'rrf', choices=('rrf', 'score'))
+    search_rrf_k: int = _env('RT_SEARCH_RRF_K', 60, minimum=0)
+
+    # Group hits by source document, fetching extra hits to fill search_top documents
+    search_group_by_document: bool = _env('RT_SEARCH_GROUP_BY_DOCUMENT', False)
+    search_group_overfetch: int = _env('RT_SEARCH_GROUP_OVERFETCH', 3, minimum=1)
+    search_group_max_chunks: int = _env('RT_SEARCH_GROUP_MAX_CHUNKS', 3, minimum=0)
+
+    # Query planner
+    search_query_planner: bool = _env('RT_SEARCH_QUERY_PLANNER', True)
+    planner_vocabulary_path: str = _env('RT_SEARCH_VOCABULARY_PATH', 'vocab/{index}.json')
+    planner_rare_ratio: float = _env('RT_SEARCH_PLANNER_RARE_RATIO', 0.01, minimum=0, maximum=1)
+    planner_common_ratio: float = _env('RT_SEARCH_PLANNER_COMMON_RATIO', 0.5, minimum=0, maximum=1)
+    planner_min_fuzzy_length: int = _env('RT_SEARCH_PLANNER_MIN_FUZZY_LENGTH', 5, minimum=1)
+    planner_phrase_slop: int = _env('RT_SEARCH_PLANNER_PHRASE_SLOP', 2, minimum=0)
+    planner_phrase_boost: float = _env('RT_SEARCH_PLANNER_PHRASE_BOOST', 2.0, minimum=0)
+
+    # Completion tunables
+    completion_max_tokens: int = _env('RT_COMPLETION_MAX_TOKENS', 200, minimum=1)
+    completion_temperature: float = _env('RT_COMPLETION_TEMPERATURE', 0.7, minimum=0, maximum=2)
+    completion_top_p: float = _env('RT_COMPLETION_TOP_P', 0.95, minimum=0, maximum=1)
+
+    # API responses
+    response_version: int = _env('RT_SEARCH_RESPONSE_VERSION', 1, choices=(1, 2))
+
+    # Query recorder
+    record_sample_rate: float = _env('RT_SEARCH_RECORD_SAMPLE_RATE', 0.0, minimum=0, maximum=1)
+    record_path: str = _env('RT_SEARCH_RECORD_PATH', 'logs/queries-{pid}.jsonl')
+    record_max_bytes: int = _env('RT_SEARCH_RECORD_MAX_BYTES', 10 * 1024 * 1024, minimum=1)
+    record_backups: int = _env('RT_SEARCH_RECORD_BACKUPS', 3, minimum=0)
+    record_max_total_bytes: int = _env('RT_SEARCH_RECORD_MAX_TOTAL_BYTES', 100 * 1024 * 1024, minimum=0)
+
+    # Response cache
+    cache_ttl: float = _env('RT_SEARCH_CACHE_TTL', 600.0, minimum=0)
+    cache_max_entries: int = _env('RT_SEARCH_CACHE_MAX_ENTRIES', 1000, minimum=1)
+
+    # Background cache warmer
+    warm_enabled: bool = _env('RT_SEARCH_WARM_ENABLED', False)
+    warm_queries_file: str = _env('RT_SEARCH_WARM_QUERIES_FILE', '')
+    warm_history_path: str = _env('RT_SEARCH_WARM_HISTORY_PATH', '')
+    warm_top_n: int = _env('RT_SEARCH_WARM_TOP_N', 200, minimum=0)
+    warm_rate: float = _env('RT_SEARCH_WARM_RATE', 0.5, minimum=0.01)
+    warm_refresh_margin: float = _env('RT_SEARCH_WARM_REFRESH_MARGIN', 120.0, minimum=0)
+    warm_interval: float = _env('RT_SEARCH_WARM_INTERVAL', 60.0, minimum=0)
+    # Directory shared by the workers on a host: warmer election lock and warmed responses
+    warm_store_path: str = _env('RT_SEARCH_WARM_STORE_PATH', 'cache/warm')
+
+    # Request profiling; requests carrying the token in X-Profile are always profiled
+    profile_token: str = _env('RT_SEARCH_PROFILE_TOKEN', '')
+    profile_sample_rate: float = _env('RT_SEARCH_PROFILE_SAMPLE_RATE', 0.0, minimum=0, maximum=1)
+    profile_dir: str = _env('RT_SEARCH_PROFILE_DIR', 'profiles')
+    profile_max_profiles: int = _env('RT_SEARCH_PROFILE_MAX_PROFILES', 50, minimum=1)
+    profile_interval_ms: float = _env('RT_SEARCH_PROFILE_INTERVAL_MS', 5.0, minimum=0.1)
+
+    # Gunicorn sizing, read by gunicorn.conf.py in the master process; 0 workers means 2 x CPUs + 1
+    gunicorn_workers: int = _env('GUNICORN_WORKERS', 0, minimum=0)
+    gunicorn_threads: int = _env('GUNICORN_THREADS', 2, minimum=1)
+    gunicorn_timeout: int = _env('GUNICORN_TIMEOUT', 300, minimum=1)
+
+    # Reloading
+    settings_poll_interval: float = _env('RT_SEARCH_SETTINGS_POLL', 5.0, minimum=0.1)
+
+def _coerce(value, type_):
+    """Convert an environment string or JSON value to a field's type."""
+    if get_origin(type_) is tuple:
+        if isinstance(value, str):
+            return tuple(part.strip() for part in value.split(',') if part.strip())
+        return tuple(value)
+    if type_ is bool and isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    if type_ in (int, float) and isinstance(value, bool):
+        raise TypeError(f'expected a number, got {value!r}')
+    if type_ is int and isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f'expected an integer, got {value!r}')
+        return int(value)
+    return type_(value)
+
+def _check_range(f: dataclasses.Field, value):
+    """Raise ValueError if a coerced value is outside the field's allowed range."""
+    minimum, maximum, choices = f.metadata['minimum'], f.metadata['maximum'], f.metadata['choices']
+    if choices is not None and value not in choices:
+        raise ValueError(f"must be one of {', '.join(map(str, choices))}")
+    if minimum is not None and value < minimum:
+        raise ValueError(f'must be at least {minimum}')
+    if maximum is not None and value > maximum:
+        raise ValueError(f'must be at most {maximum}')
+
+def load_settings(overrides: Optional[Dict] = None) -> Settings:
+    """Build settings from the environment and an optional overrides mapping.
+
+    Raises:
+        ValueError: If required values are missing or a value has the wrong type or is out of range
+    """
+    overrides = overrides or {}
+    unknown = set(overrides) - {f.name for f in fields(Settings)}
+    if unknown:
+        raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+
+    values = {}
+    missing = []
+    for f in fields(Settings):
+        env_name = f.metadata['env']
+        if f.name in overrides:
+            raw = overrides[f.name]
+        elif os.getenv(env_name):
+            raw = os.getenv(env_name)
+        elif f.default is dataclasses.MISSING:
+            missing.append(env_name)
+            continue
+        else:
+            continue
+        try:
+            values[f.name] = _coerce(raw, f.type)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid value for {f.name} ({env_name}): {raw!r}')
+        try:
+            _check_range(f, values[f.name])
+        except ValueError as e:
+            raise ValueError(f'Invalid value for {f.name} ({env_name}): {raw!r} ({str(e)})')
+
+    if missing:
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+
+    return Settings(**values)
+
+def _read_settings_file(path: str) -> Dict:
+    """Read the JSON overrides file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        overrides = json.load(f)
+    if not isinstance(overrides, dict):
+        raise ValueError(f'Settings file {path} must contain a JSON object')
+    return overrides
+
+def load_setting(name: str):
+    """Load a single setting without requiring the others.
+
+    Used where the Azure configuration may not be available, such as the
+    gunicorn master process. The settings file wins over the environment.
+
+    Raises:
+        ValueError: If the value has the wrong type or is out of range
+    """
+    f = next(f for f in fields(Settings) if f.name == name)
+    env_name = f.metadata['env']
+    path = os.getenv('RT_SEARCH_SETTINGS_FILE')
+    overrides = _read_settings_file(path) if path and os.path.exists(path) else {}
+    if name in overrides:
+        raw = overrides[name]
+    elif os.getenv(env_name):
+        raw = os.getenv(env_name)
+    else:
+        return f.default
+    try:
+        value = _coerce(raw, f.type)
+        _check_range(f, value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'Invalid value for {name} ({env_name}): {raw!r} ({str(e)})')
+    return value
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+_settings_mtime: Optional[float] = None
+_watcher: Optional[threading.Thread] = None
+
+def get_settings() -> Settings:
+    """Return the current settings, loading them on first use."""
+    if _settings is None:
+        reload_settings(raise_errors=True)
+    return _settings
+
+def reload_settings(raise_errors: bool = False, startup: bool = False) -> Settings:
+    """Re-read the environment and settings file and swap in the result.
+
+    On failure the previous settings stay active unless ``raise_errors`` is set
+    or there are no previous settings. Fields in ``RESTART_REQUIRED`` keep their
+    previous values, since clients were built with them, unless ``startup`` is
+    set because no clients exist yet.
+    """
+    global _settings, _settings_mtime
+    with _settings_lock:
+        path = os.getenv('RT_SEARCH_SETTINGS_FILE')
+        mtime = None
+        try:
+            overrides = {}
+            if path and os.path.exists(path):
+                mtime = os.path.getmtime(path)
+                overrides = _read_settings_file(path)
+            new = load_settings(overrides)
+        except Exception as e:
+            if raise_errors or _settings is None:
+                raise
+            logger.error(f'Failed to reload settings, keeping previous values: {str(e)}')
+            # Do not retry the same broken file on every poll
+            _settings_mtime = mtime
+            return _settings
+
+        if _settings is not None:
+            changed = [f.name for f in fields(Settings) if getattr(_settings, f.name) != getattr(new, f.name)]
+            if changed:
+                logger.info(f'Settings changed: {", ".join(changed)}')
+            restart = [name for name in changed if name in RESTART_REQUIRED]
+            if restart and not startup:
+                logger.warning(f'Settings require a restart to take effect: {", ".join(restart)}')
+                new = dataclasses.replace(new, **{name: getattr(_settings, name) for name in restart})
+        _settings = new
+        _settings_mtime = mtime
+        return _settings
+
+def _watch_settings_file():
+    """Poll the settings file and reload it when its modification time changes."""
+    while True:
+        interval = _settings.settings_poll_interval if _settings else 5.0
+        time.sleep(max(0.5, interval))
+        path = os.getenv('RT_SEARCH_SETTINGS_FILE')
+        if not path:
+            continue
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if mtime != _settings_mtime:
+            logger.info(f'Settings file {path} changed, reloading')
+            reload_settings()
+
+def start_settings_watcher():
+    """Reload settings on SIGHUP and when the settings file changes."""
+    global _watcher
+    if threading.current_thread() is threading.main_thread() and hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_settings())
+    if _watcher is None and os.getenv('RT_SEARCH_SETTINGS_FILE'):
+        _watcher = threading.Thread(target=_watch_settings_file, name='settings-watcher', daemon=True)
+        _watcher.start()
 
 def get_required_search_vars() -> Dict[str, str]:
     """Get required environment variables for search"""
-    vars = {
-        'AZURE_OPENAI_ENDPOINT': os.getenv('AZURE_OPENAI_ENDPOINT'),
-        'AZURE_OPENAI_DEPLOYMENT': os.getenv('AZURE_OPENAI_DEPLOYMENT'),
-        'AZURE_OPENAI_API_KEY': os.getenv('AZURE_OPENAI_API_KEY'),
-        'AZURE_AI_SEARCH_ENDPOINT': os.getenv('AZURE_AI_SEARCH_ENDPOINT'),
-        'AZURE_AI_SEARCH_INDEX': os.getenv('AZURE_AI_SEARCH_INDEX'),
-        'AZURE_AI_SEARCH_API_KEY': os.getenv('AZURE_AI_SEARCH_API_KEY')
+    settings = get_settings()
+    return {
+        'AZURE_OPENAI_ENDPOINT': settings.openai_endpoint,
+        'AZURE_OPENAI_DEPLOYMENT': settings.openai_deployment,
+        'AZURE_OPENAI_API_KEY': settings.openai_api_key,
+        'AZURE_AI_SEARCH_ENDPOINT': settings.search_endpoint,
+        'AZURE_AI_SEARCH_INDEX': ','.join(settings.search_indexes),
+        'AZURE_AI_SEARCH_API_KEY': settings.search_api_key
     }
-    
-    # Check for missing variables
-    missing = [key for key, value in vars.items() if not value]
-    if missing:
-        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
-    
-    return vars
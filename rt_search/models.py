@@ -0,0 +1,128 @@
+"""Result models shared across the search pipeline."""
+import re
+from typing import Dict, List, Optional
+
+from .utils import truncate_text
+
+# Response formats for /api/search
+LEGACY_VERSION = 1
+ENVELOPE_VERSION = 2
+
+# Characters of plain text in a grouped chunk without a caption
+CHUNK_SNIPPET_LENGTH = 160
+
+_HIGHLIGHT_TAGS = re.compile(r'</?mark>')
+
+class SearchResult:
+    """A single transformed search hit."""
+
+    __slots__ = (
+        'content', 'context', 'relevance', 'caption', 'filename', 'filepath',
+        'metadata_storage_path', 'metadata_storage_name', 'url', 'chunks'
+    )
+
+    def __init__(self, content: str = '', context: str = '', relevance: float = 0.0, caption: str = '',
+                 filename: str = '', filepath: str = '', metadata_storage_path: str = '',
+                 metadata_storage_name: str = '', url: str = '', chunks: Optional[List['SearchResult']] = None):
+        self.content = content
+        self.context = context
+        self.relevance = relevance
+        self.caption = caption
+        self.filename = filename
+        self.filepath = filepath
+        self.metadata_storage_path = metadata_storage_path
+        self.metadata_storage_name = metadata_storage_name
+        self.url = url
+        # Other hits from the same document when results are grouped
+        self.chunks = chunks
+
+    def __repr__(self) -> str:
+        return f'SearchResult(filename={self.filename!r}, relevance={self.relevance!r})'
+
+    def document_key(self) -> str:
+        """Source document this hit was chunked from."""
+        return (self.metadata_storage_path or self.url or self.filepath
+                or self.metadata_storage_name or self.filename)
+
+    def chunk_ref(self, content: bool = False) -> Dict:
+        """Reference to a grouped hit: relevance with its caption or a short snippet.
+
+        Args:
+            content (bool): Also include the full highlighted content
+        """
+        ref = {'relevance': self.relevance}
+        if self.caption:
+            ref['caption'] = self.caption
+        else:
+            ref['snippet'] = truncate_text(_HIGHLIGHT_TAGS.sub('', self.content), CHUNK_SNIPPET_LENGTH)
+        if content:
+            ref['content'] = self.content
+        return ref
+
+    def to_dict(self, summary: str = '', chunk_content: bool = False) -> Dict:
+        """Row in the legacy list format, which carries a summary on every row."""
+        row = {
+            'content': self.content,
+            'context': self.context,
+            'relevance': self.relevance,
+            'summary': summary,
+            'filename': self.filename,
+            'filepath': self.filepath,
+            'metadata_storage_path': self.metadata_storage_path,
+            'metadata_storage_name': self.metadata_storage_name,
+            'url': self.url
+        }
+        if self.chunks:
+            row['chunks'] = [chunk.chunk_ref(chunk_content) for chunk in self.chunks]
+        return row
+
+    def to_compact_dict(self, chunk_content: bool = False) -> Dict:
+        """Row in the envelope format; empty fields are omitted."""
+        row = {'content': self.content, 'relevance': self.relevance}
+        for field in ('context', 'caption', 'filename', 'filepath', 'metadata_storage_path',
+                      'metadata_storage_name', 'url'):
+            value = getattr(self, field)
+            if value:
+                row[field] = value
+        if self.chunks:
+            row['chunks'] = [chunk.chunk_ref(chunk_content) for chunk in self.chunks]
+        return row
+
+class SearchResponse:
+    """Search results together with the generated summary."""
+
+    __slots__ = ('summary', 'results', 'timings')
+
+    def __init__(self, summary: str = '', results: Optional[List[SearchResult]] = None,
+                 timings: Optional[Dict[str, float]] = None):
+        self.summary = summary
+        self.results = results if results is not None else []
+        self.timings = timings if timings is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def to_legacy(self, chunk_content: bool = False) -> List[Dict]:
+        """List format: one dict per hit, summary on the first row only."""
+        return [
+            result.to_dict(self.summary if idx == 0 else '', chunk_content)
+            for idx, result in enumerate(self.results)
+        ]
+
+    def to_envelope(self, chunk_content: bool = False) -> Dict:
+        """Envelope format: summary and timings once, compact rows."""
+        return {
+            'summary': self.summary,
+            'count': len(self.results),
+            'timings': {stage: round(ms, 1) for stage, ms in self.timings.items()},
+            'results': [result.to_compact_dict(chunk_content) for result in self.results]
+        }
+
+    def to_version(self, version: int, chunk_content: bool = False):
+        """Serialize for the requested response format version.
+
+        Grouped chunks are references unless ``chunk_content`` is set.
+        """
+        if version == ENVELOPE_VERSION:
+            return self.to_envelope(chunk_content)
+        return self.to_legacy(chunk_content)
@@ -0,0 +1,129 @@
+"""Fan-out search across several Azure Cognitive Search indexes."""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import get_settings
+from .models import SearchResult
+from .profiling import propagate
+from .search_operations import SearchOperations
+
+logger = logging.getLogger(__name__)
+
+# Fusion methods
+RRF = 'rrf'
+SCORE = 'score'
+
+def result_key(result: SearchResult) -> Tuple[str, str]:
+    """Identity of a hit across indexes: source document plus content."""
+    return result.document_key(), result.content
+
+def reciprocal_rank_fusion(ranked_lists: Sequence[List[SearchResult]], k: int = 60) -> List[SearchResult]:
+    """Merge ranked lists with reciprocal-rank fusion.
+
+    Each hit scores ``sum(1 / (k + rank))`` over the lists it appears in.
+    The fused score replaces ``relevance`` on the returned results.
+    """
+    fused: Dict[Tuple[str, str], List] = {}
+    for results in ranked_lists:
+        for rank, result in enumerate(results, start=1):
+            entry = fused.setdefault(result_key(result), [0.0, result])
+            entry[0] += 1.0 / (k + rank)
+    return _ordered(fused)
+
+def normalized_score_fusion(ranked_lists: Sequence[List[SearchResult]]) -> List[SearchResult]:
+    """Merge ranked lists by summing min-max normalized relevance scores."""
+    fused: Dict[Tuple[str, str], List] = {}
+    for results in ranked_lists:
+        if not results:
+            continue
+        scores = [result.relevance for result in results]
+        low, high = min(scores), max(scores)
+        spread = high - low
+        for result in results:
+            normalized = (result.relevance - low) / spread if spread else 1.0
+            entry = fused.setdefault(result_key(result), [0.0, result])
+            entry[0] += normalized
+    return _ordered(fused)
+
+def _ordered(fused: Dict[Tuple[str, str], List]) -> List[SearchResult]:
+    """Sort fused entries by score and write the score back to the results."""
+    merged = []
+    for score, result in sorted(fused.values(), key=lambda entry: entry[0], reverse=True):
+        result.relevance = score
+        merged.append(result)
+    return merged
+
+class MultiIndexSearchClient:
+    """Query several indexes in parallel and fuse their hit lists."""
+
+    def __init__(self, endpoint: str, index_names: Sequence[str], api_key: str):
+        """Initialize one search client per index.
+
+        The fusion method (``search_fusion``), result count (``search_top``) and
+        RRF constant (``search_rrf_k``) are read from settings on every search.
+
+        Args:
+            endpoint (str): Azure Cognitive Search endpoint
+            index_names (list): Names of the search indexes
+            api_key (str): API key for authentication
+        """
+        # Each client inspects its own index, so field schemas stay per index
+        self.clients = [SearchOperations(endpoint, name, api_key) for name in index_names]
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self.clients)) * 4,
+            thread_name_prefix='index-search'
+        )
+        logger.info(f'Multi-index search over {list(index_names)}')
+
+    @property
+    def schema_ready(self) -> bool:
+        """Whether every index schema has been inspected."""
+        return all(client.schema_ready for client in self.clients)
+
+    @property
+    def schema_error(self) -> Optional[str]:
+        """First schema inspection failure among the indexes, if any."""
+        return next((client.schema_error for client in self.clients if client.schema_error), None)
+
+    def _search_index(self, client: SearchOperations, query: str, top: Optional[int]) -> List[SearchResult]:
+        """Search a single index, timing the request."""
+        start = time.perf_counter()
+        results = client.search(query, top=top)
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f'Index {client._index_name}: {len(results)} results in {elapsed:.1f} ms')
+        return results
+
+    def search(self, query: str, top: Optional[int] = None) -> List[SearchResult]:
+        """Search all indexes concurrently and return the fused top results.
+
+        Args:
+            query (str): Search query
+            top (int, optional): Hits to fetch per index and return; defaults to ``search_top``
+
+        A failing index contributes no results; the search raises only when every
+        index failed.
+        """
+        # Index searches are sampled along with the request when it is being profiled
+        task = propagate(self._search_index)
+        futures = [self._executor.submit(task, client, query, top) for client in self.clients]
+        ranked_lists = []
+        errors = []
+        for client, future in zip(self.clients, futures):
+            try:
+                ranked_lists.append(future.result())
+            except Exception as e:
+                logger.error(f'Search on index {client._index_name} failed: {str(e)}')
+                errors.append(e)
+        if errors and not ranked_lists:
+            raise errors[0]
+
+        settings = get_settings()
+        if settings.search_fusion == SCORE:
+            merged = normalized_score_fusion(ranked_lists)
+        else:
+            if settings.search_fusion != RRF:
+                logger.warning(f'Unknown fusion method {settings.search_fusion}, using {RRF}')
+            merged = reciprocal_rank_fusion(ranked_lists, k=settings.search_rrf_k)
+        return merged[:top or settings.search_top]
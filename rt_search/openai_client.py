@@ -1,6 +1,7 @@
 """Azure OpenAI client module."""
 import logging
-from openai import AzureOpenAI
+import threading
+from .config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -10,16 +11,27 @@ class OpenAIClient:
         self.endpoint = endpoint
         self.deployment = deployment
         self.api_key = api_key
+        self._client = None
+        self._client_lock = threading.Lock()
 
-        # Initialize Azure OpenAI client
-        self.client = AzureOpenAI(
-            azure_endpoint=self.endpoint,
-            api_key=self.api_key,
-            api_version='2024-02-15-preview'
-        )
+    @property
+    def client(self):
+        """Azure OpenAI client, created (and ``openai`` imported) on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import AzureOpenAI
+                    self._client = AzureOpenAI(
+                        azure_endpoint=self.endpoint,
+                        api_key=self.api_key,
+                        api_version=get_settings().openai_api_version,
+                        default_headers={'User-Agent': 'rt-search/1.0.0'}
+                    )
+        return self._client
 
     def get_completion(self, query: str, context: str = '') -> str:
         """Get a completion from Azure OpenAI"""
+        settings = get_settings()
         try:
             # Prepare messages
             messages = [
@@ -37,9 +49,9 @@ class OpenAIClient:
             response = self.client.chat.completions.create(
                 model=self.deployment,
                 messages=messages,
-                max_tokens=200,
-                temperature=0.7,
-                top_p=0.95,
+                max_tokens=settings.completion_max_tokens,
+                temperature=settings.completion_temperature,
+                top_p=settings.completion_top_p,
                 frequency_penalty=0,
                 presence_penalty=0,
                 stop=None
@@ -0,0 +1,223 @@
+"""Background pre-warming of cached responses for popular queries."""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .config import Settings, get_settings
+from .utils import normalize_query
+
+try:
+    import fcntl
+except ImportError:  # Windows: every worker warms its own cache
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Held by the one warmer on a host that refreshes entries
+LEADER_LOCK_FILE = '.warmer.lock'
+
+class QueryHistory:
+    """Query frequencies from recorder files, updated incrementally.
+
+    Recorder files are append-only until rotated, so each file's counts are
+    kept together with the offset read so far. A later call reads only the
+    lines appended since then, and re-reads a file only when it was replaced
+    or truncated.
+    """
+
+    def __init__(self):
+        # path -> (inode, offset, counts)
+        self._files: Dict[str, Tuple[int, int, Counter]] = {}
+
+    def counts(self, pattern: str) -> Counter:
+        """Query counts across all files matching a glob pattern."""
+        files = {}
+        for path in sorted(glob.glob(pattern)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            inode, offset, counts = self._files.get(path, (None, 0, None))
+            if counts is None or inode != stat.st_ino or stat.st_size < offset:
+                inode, offset, counts = stat.st_ino, 0, Counter()
+            if stat.st_size > offset:
+                try:
+                    offset = self._read(path, offset, counts)
+                except OSError as e:
+                    logger.error(f'Cannot read {path}: {str(e)}')
+            files[path] = (inode, offset, counts)
+        # Forget files that were removed
+        self._files = files
+
+        total = Counter()
+        for _, _, counts in files.values():
+            total.update(counts)
+        return total
+
+    @staticmethod
+    def _read(path: str, offset: int, counts: Counter) -> int:
+        """Count the complete lines after offset and return the new offset."""
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # A line still being written is read on the next call
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                counts[json.loads(line).get('query', '')] += 1
+            except (ValueError, AttributeError):
+                logger.warning(f'Skipping malformed record in {path}')
+        return offset + end
+
+def load_popular_queries(settings: Settings, history: Optional[QueryHistory] = None) -> List[str]:
+    """Most frequent queries from the configured list and recorded history.
+
+    Queries in ``warm_queries_file`` (one per line, ``#`` comments allowed) come
+    first in file order; recorded history from ``warm_history_path`` fills the
+    rest by frequency, up to ``warm_top_n`` queries in total. Pass a
+    :class:`QueryHistory` to avoid re-reading the history on every call.
+    """
+    queries: List[str] = []
+    seen = set()
+
+    def add(query: str):
+        normalized = normalize_query(query)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            queries.append(normalized)
+
+    if settings.warm_queries_file:
+        try:
+            with open(settings.warm_queries_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        add(line)
+        except OSError as e:
+            logger.error(f'Cannot read warm queries file: {str(e)}')
+
+    if settings.warm_history_path:
+        counts = (history or QueryHistory()).counts(settings.warm_history_path)
+        for query, _ in counts.most_common(settings.warm_top_n):
+            add(query)
+
+    return queries[:settings.warm_top_n]
+
+class CacheWarmer:
+    """Refresh cached responses for popular queries ahead of expiry.
+
+    Every worker starts a warmer, but only the one holding an exclusive lock in
+    ``warm_store_path`` does any work; the others retry the lock each cycle and
+    take over if the leader exits. Each cycle the leader reloads the popular
+    query list and refreshes every query whose shared entry is missing or
+    expires within ``warm_refresh_margin`` seconds, writing the response to the
+    shared store that all workers read on a local cache miss. Refreshes are
+    spaced to stay under ``warm_rate`` queries per second for the whole host.
+    """
+
+    def __init__(self, search_client):
+        """Initialize the warmer.
+
+        Args:
+            search_client (SearchClient): Client whose cache is kept warm
+        """
+        self.search_client = search_client
+        self.refreshed = 0
+        self.failed = 0
+        self.history = QueryHistory()
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the warmer thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='cache-warmer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the warmer thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def is_leader(self, settings: Settings) -> bool:
+        """Whether this process warms for the host, trying to take the lock if not."""
+        if fcntl is None or self._lock_file is not None:
+            return True
+        try:
+            os.makedirs(settings.warm_store_path, exist_ok=True)
+            lock_file = open(os.path.join(settings.warm_store_path, LEADER_LOCK_FILE), 'a')
+        except OSError as e:
+            logger.error(f'Cannot open cache warmer lock: {str(e)}')
+            return False
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        logger.info(f'Process {os.getpid()} is the cache warmer for this host')
+        return True
+
+    def run_once(self) -> int:
+        """Run a single warming cycle.
+
+        Returns:
+            int: Number of queries refreshed
+        """
+        settings = get_settings()
+        if not settings.warm_enabled or settings.cache_ttl <= 0 or not self.is_leader(settings):
+            return 0
+
+        shared = self.search_client.get_shared_cache(settings)
+        refreshed = 0
+        interval = 1.0 / settings.warm_rate if settings.warm_rate > 0 else 0.0
+        for query in load_popular_queries(settings, self.history):
+            if self._stop.is_set():
+                break
+            key = self.search_client.cache_key(query, settings)
+            if shared.ttl_remaining(key) > settings.warm_refresh_margin:
+                continue
+
+            start = time.monotonic()
+            try:
+                response = self.search_client.search(query, use_cache=False)
+                # An empty summary means the completion failed; leave the entry to expire
+                if response.summary:
+                    shared.set(key, (response.results, response.summary), settings.cache_ttl)
+                refreshed += 1
+                self.refreshed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f'Failed to warm query {query!r}: {str(e)}')
+
+            # Cap the background rate
+            remaining = interval - (time.monotonic() - start)
+            if remaining > 0:
+                self._stop.wait(remaining)
+
+        shared.prune()
+        if refreshed:
+            logger.info(f'Cache warmer refreshed {refreshed} queries')
+        return refreshed
+
+    def _run(self):
+        """Warmer loop running on the background thread."""
+        logger.info(f'Cache warmer started in process {os.getpid()}')
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f'Cache warmer cycle failed: {str(e)}')
+            self._stop.wait(max(1.0, get_settings().warm_interval))
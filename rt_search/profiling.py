@@ -0,0 +1,242 @@
+"""On-demand request profiling.
+
+A profiled request runs with a sampling profiler that records the stacks of the
+request thread in collapsed format (one ``frame;frame;frame count`` line per
+stack, readable by flamegraph.pl and speedscope), and with tracemalloc enabled
+to summarize the allocations made while it ran. Only one request is profiled at
+a time per process; others run normally.
+
+Work that a request hands to a thread pool is sampled too when the task is
+wrapped with :func:`propagate`. Each stack starts with the name of the thread
+it was sampled on, so pool threads appear as separate roots in the flamegraph.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sampler of the profile the current thread is working for, if any
+_active = threading.local()
+
+def _frame_name(frame) -> str:
+    """Function name with a short source location."""
+    code = frame.f_code
+    path = code.co_filename.replace('\\', '/').rsplit('/', 2)
+    return f'{code.co_name} ({"/".join(path[-2:])}:{code.co_firstlineno})'
+
+def _mtime(path: str) -> float:
+    """Modification time, or 0 if another worker already removed the file."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+def propagate(fn: Callable) -> Callable:
+    """Wrap a task so that the thread running it is sampled with the current profile.
+
+    Returns ``fn`` unchanged when the calling thread is not being profiled.
+    """
+    sampler = getattr(_active, 'sampler', None)
+    if sampler is None:
+        return fn
+
+    def run(*args, **kwargs):
+        previous = getattr(_active, 'sampler', None)
+        _active.sampler = sampler
+        sampler.add_thread()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.remove_thread()
+            _active.sampler = previous
+    return run
+
+class StackSampler:
+    """Sample the stacks of a set of threads at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """Initialize the sampler.
+
+        Args:
+            thread_id (int): Thread to sample; more can join with :meth:`add_thread`
+            interval (float): Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._threads: Dict[int, str] = {thread_id: threading.current_thread().name}
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def add_thread(self):
+        """Sample the calling thread until :meth:`remove_thread`."""
+        with self._threads_lock:
+            self._threads[threading.get_ident()] = threading.current_thread().name
+
+    def remove_thread(self):
+        """Stop sampling the calling thread."""
+        with self._threads_lock:
+            self._threads.pop(threading.get_ident(), None)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._threads_lock:
+                threads = list(self._threads.items())
+            sampled = False
+            for thread_id, thread_name in threads:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(_frame_name(frame))
+                    frame = frame.f_back
+                names.append(thread_name)
+                self.stacks[';'.join(reversed(names))] += 1
+                sampled = True
+            self.samples += sampled
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed flamegraph format."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+class Profile:
+    """Files written for one profiled request."""
+
+    def __init__(self, profile_id: str, label: str):
+        self.profile_id = profile_id
+        self.label = label
+        self.duration_ms = 0.0
+        self.samples = 0
+        self.stack_path = ''
+        self.alloc_path = ''
+
+class RequestProfiler:
+    """Profile requests into a bounded local directory."""
+
+    def __init__(self, directory: str = 'profiles', max_profiles: int = 50, interval_ms: float = 5.0,
+                 top_allocations: int = 30):
+        """Initialize the profiler.
+
+        Args:
+            directory (str): Where profiles are written
+            max_profiles (int): Oldest profiles are deleted beyond this count
+            interval_ms (float): Stack sampling interval in milliseconds
+            top_allocations (int): Source lines listed in the allocation summary
+        """
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self.interval = interval_ms / 1000.0
+        self.top_allocations = top_allocations
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile(self, label: str = 'request') -> Iterator[Optional[Profile]]:
+        """Profile the enclosed block on the current thread.
+
+        Yields None, without profiling, if another profile is already running.
+        """
+        if not self._lock.acquire(blocking=False):
+            yield None
+            return
+        try:
+            profile = Profile(f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{uuid.uuid4().hex[:8]}', label)
+            owns_tracemalloc = not tracemalloc.is_tracing()
+            if owns_tracemalloc:
+                tracemalloc.start(10)
+            tracemalloc.reset_peak()
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+            _active.sampler = sampler
+            start = time.perf_counter()
+            try:
+                yield profile
+            finally:
+                profile.duration_ms = (time.perf_counter() - start) * 1000
+                _active.sampler = None
+                sampler.stop()
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                if owns_tracemalloc:
+                    tracemalloc.stop()
+                profile.samples = sampler.samples
+                try:
+                    self._write(profile, sampler, snapshot, current, peak)
+                except OSError as e:
+                    logger.error(f'Failed to write profile {profile.profile_id}: {str(e)}')
+        finally:
+            self._lock.release()
+
+    def _write(self, profile: Profile, sampler: StackSampler, snapshot, current: int, peak: int):
+        """Write the collapsed stacks and allocation summary, then prune old files."""
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile.profile_id)
+
+        profile.stack_path = f'{base}.collapsed'
+        with open(profile.stack_path, 'w', encoding='utf-8') as f:
+            f.write(sampler.collapsed())
+
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, __file__)
+        ))
+        stats = snapshot.statistics('lineno')
+        profile.alloc_path = f'{base}.alloc.txt'
+        with open(profile.alloc_path, 'w', encoding='utf-8') as f:
+            f.write(f'label: {profile.label}\n')
+            f.write(f'duration: {profile.duration_ms:.1f} ms, {sampler.samples} stack samples\n')
+            f.write(f'traced memory: {current / 1024:.1f} KiB live, {peak / 1024:.1f} KiB peak\n')
+            f.write(f'live allocations: {sum(stat.count for stat in stats)} blocks, '
+                    f'{sum(stat.size for stat in stats) / 1024:.1f} KiB\n')
+            f.write('note: tracemalloc is process-wide, so concurrent requests are included\n\n')
+            f.write(f'top {self.top_allocations} source lines by live size:\n')
+            for stat in stats[:self.top_allocations]:
+                frame = stat.traceback[0]
+                f.write(f'  {stat.size / 1024:9.1f} KiB {stat.count:7d} blocks  {frame.filename}:{frame.lineno}\n')
+
+        logger.info(f'Wrote profile {profile.profile_id} ({profile.duration_ms:.1f} ms) to {self.directory}')
+        self._prune(base)
+
+    def _prune(self, keep: str):
+        """Delete the oldest profiles beyond max_profiles, never the one at ``keep``."""
+        try:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+        except OSError:
+            return
+        # Remove whole profiles so that stacks and allocations stay paired
+        profiles: Dict[str, list] = {}
+        for path in paths:
+            for suffix in ('.collapsed', '.alloc.txt'):
+                if path.endswith(suffix):
+                    profiles.setdefault(path[:-len(suffix)], []).append(path)
+        count = len(profiles)
+        for base in sorted(profiles, key=lambda base: max(_mtime(path) for path in profiles[base])):
+            if count <= self.max_profiles:
+                break
+            if base == keep:
+                continue
+            for path in profiles[base]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            count -= 1
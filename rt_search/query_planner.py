@@ -0,0 +1,314 @@
+"""Vocabulary-aware query planning.
+
+Instead of expanding every term with ``~1`` and joining them with ``OR``, the
+planner uses document frequencies from the index to decide per term:
+
+- stopwords and terms found in most documents are dropped,
+- terms missing from the vocabulary (likely misspelled) or rare terms get fuzzy matching,
+- all other terms are matched exactly,
+- multi-word queries also get a boosted proximity clause for the whole phrase.
+
+Build a vocabulary and inspect plans with:
+    python -m rt_search.query_planner build
+    python -m rt_search.query_planner plan "limitation of liability"
+"""
+import argparse
+import json
+import logging
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from .config import Settings, get_settings
+from .utils import clean_query
+
+logger = logging.getLogger(__name__)
+
+# Term actions
+DROP = 'drop'
+EXACT = 'exact'
+FUZZY = 'fuzzy'
+
+# Common English and contract boilerplate words that carry no search signal
+STOPWORDS = frozenset('''
+a about above after again against all an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has
+have having he her here hers him his how i if in into is it its itself me more most my no nor not
+of off on once only or other our ours out over own same she should so some such than that the their
+theirs them then there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your yours
+shall hereby herein hereof hereto hereunder thereof therein thereto such said upon per
+'''.split())
+
+_TOKEN = re.compile(r'\w+')
+
+# Fuzzy expansions remembered per vocabulary
+FUZZY_CACHE_SIZE = 10000
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, roughly matching the standard Lucene analyzer."""
+    return _TOKEN.findall(text.lower())
+
+def edit_distance_within(a: str, b: str, limit: int) -> bool:
+    """Whether the Levenshtein distance between a and b is at most limit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+class Vocabulary:
+    """Document frequencies of the terms in an index."""
+
+    def __init__(self, doc_count: int = 0, df: Optional[Dict[str, int]] = None):
+        self.doc_count = doc_count
+        self.df = df or {}
+        self._by_length: Optional[Dict[int, List[str]]] = None
+        self._fuzzy_cache: Dict[tuple, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def frequency(self, term: str) -> int:
+        """Number of documents containing the term."""
+        return self.df.get(term, 0)
+
+    def fuzzy_matches(self, term: str, distance: int) -> List[str]:
+        """Vocabulary terms within the given edit distance of term."""
+        cached = self._fuzzy_cache.get((term, distance))
+        if cached is not None:
+            return cached
+        if self._by_length is None:
+            by_length: Dict[int, List[str]] = {}
+            for word in self.df:
+                by_length.setdefault(len(word), []).append(word)
+            self._by_length = by_length
+        matches = []
+        for length in range(len(term) - distance, len(term) + distance + 1):
+            for word in self._by_length.get(length, ()):
+                if edit_distance_within(term, word, distance):
+                    matches.append(word)
+        if len(self._fuzzy_cache) >= FUZZY_CACHE_SIZE:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[(term, distance)] = matches
+        return matches
+
+    @classmethod
+    def load(cls, path: str) -> 'Vocabulary':
+        """Load a vocabulary written by :meth:`save`."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(doc_count=data.get('doc_count', 0), df=data.get('df', {}))
+
+    def save(self, path: str):
+        """Write the vocabulary as JSON."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'doc_count': self.doc_count, 'df': self.df}, f, separators=(',', ':'))
+
+    @classmethod
+    def build(cls, client, fields: List[str], max_docs: int = 20000, page_size: int = 1000) -> 'Vocabulary':
+        """Count document frequencies by paging through an index.
+
+        Args:
+            client (SearchOperations): Client for the index
+            fields (list): Text fields to tokenize
+            max_docs (int): Stop after this many documents
+            page_size (int): Documents per request
+        """
+        df = Counter()
+        doc_count = 0
+        for page in client.iter_documents(fields, max_docs=max_docs, page_size=page_size):
+            for doc in page:
+                terms = set()
+                for name in fields:
+                    terms.update(tokenize(str(doc.get(name) or '')))
+                df.update(terms)
+            doc_count += len(page)
+            logger.info(f'Vocabulary: {doc_count} documents, {len(df)} terms')
+        return cls(doc_count=doc_count, df=dict(df))
+
+class TermPlan:
+    """Planned handling of one query term."""
+
+    __slots__ = ('term', 'df', 'action', 'expansions', 'postings')
+
+    def __init__(self, term: str, df: Optional[int], action: str, expansions: int = 1,
+                 postings: Optional[int] = None):
+        self.term = term
+        self.df = df
+        self.action = action
+        self.expansions = expansions
+        self.postings = postings if postings is not None else df
+
+    def to_dict(self) -> Dict:
+        return {'term': self.term, 'df': self.df, 'action': self.action, 'expansions': self.expansions}
+
+class QueryPlan:
+    """Planned Lucene query with a cost estimate."""
+
+    __slots__ = ('query', 'search', 'terms', 'phrase', 'estimated_postings', 'expanded_terms')
+
+    def __init__(self, query: str, search: str, terms: List[TermPlan], phrase: str = '',
+                 estimated_postings: Optional[int] = None, expanded_terms: int = 0):
+        self.query = query
+        self.search = search
+        self.terms = terms
+        self.phrase = phrase
+        self.estimated_postings = estimated_postings
+        self.expanded_terms = expanded_terms
+
+    def to_dict(self) -> Dict:
+        return {
+            'query': self.query,
+            'search': self.search,
+            'phrase': self.phrase,
+            'terms': [term.to_dict() for term in self.terms],
+            'estimated_postings': self.estimated_postings,
+            'expanded_terms': self.expanded_terms
+        }
+
+class QueryPlanner:
+    """Plan Lucene queries for one index from its vocabulary."""
+
+    def __init__(self, vocabulary: Optional[Vocabulary] = None):
+        """Initialize the planner.
+
+        Args:
+            vocabulary (Vocabulary, optional): Without one, stopwords are still
+                dropped and fuzziness is limited to longer terms
+        """
+        self.vocabulary = vocabulary if vocabulary and vocabulary.doc_count else None
+
+    @classmethod
+    def for_index(cls, index_name: str, settings: Optional[Settings] = None) -> 'QueryPlanner':
+        """Planner using the vocabulary file configured for an index, if present."""
+        settings = settings or get_settings()
+        path = settings.planner_vocabulary_path.replace('{index}', index_name)
+        vocabulary = None
+        if os.path.exists(path):
+            try:
+                vocabulary = Vocabulary.load(path)
+                logger.info(f'Loaded vocabulary for {index_name}: {len(vocabulary)} terms')
+            except (OSError, ValueError) as e:
+                logger.error(f'Cannot load vocabulary {path}: {str(e)}')
+        else:
+            logger.info(f'No vocabulary for {index_name} at {path}, planning without frequencies')
+        return cls(vocabulary)
+
+    def _plan_term(self, term: str, settings: Settings, expand: bool = False) -> TermPlan:
+        """Decide how a single term is matched.
+
+        The decision needs only document frequencies. With ``expand`` the
+        vocabulary is also scanned for the terms a fuzzy match would reach, to
+        fill in ``expansions`` and ``postings``; that scan is too slow for the
+        request path and is meant for explaining plans.
+        """
+        distance = settings.search_fuzzy_distance
+        if term in STOPWORDS:
+            return TermPlan(term, self.vocabulary.frequency(term) if self.vocabulary else None, DROP, 0)
+
+        if self.vocabulary is None:
+            action = FUZZY if distance > 0 and len(term) >= settings.planner_min_fuzzy_length else EXACT
+            return TermPlan(term, None, action)
+
+        df = self.vocabulary.frequency(term)
+        ratio = df / self.vocabulary.doc_count
+        if ratio > settings.planner_common_ratio:
+            return TermPlan(term, df, DROP, 0)
+        if distance > 0 and len(term) >= settings.planner_min_fuzzy_length and (
+                df == 0 or ratio < settings.planner_rare_ratio):
+            if not expand:
+                return TermPlan(term, df, FUZZY)
+            matches = self.vocabulary.fuzzy_matches(term, distance)
+            postings = sum(self.vocabulary.frequency(word) for word in matches)
+            return TermPlan(term, df, FUZZY, max(1, len(matches)), postings)
+        return TermPlan(term, df, EXACT)
+
+    def plan(self, query: str, settings: Optional[Settings] = None, expand: bool = False) -> QueryPlan:
+        """Plan the Lucene query for a user query.
+
+        The query is cleaned with :func:`clean_query` first, so searches and
+        explained plans tokenize it the same way. See :meth:`_plan_term` for ``expand``.
+        """
+        settings = settings or get_settings()
+        query = clean_query(query)
+        words = tokenize(query)
+        terms = [self._plan_term(word, settings, expand) for word in words]
+
+        # A query made only of dropped terms is searched as typed
+        kept = [term for term in terms if term.action != DROP]
+        if terms and not kept:
+            for term in terms:
+                term.action = EXACT
+                term.expansions = 1
+                term.postings = term.df
+            kept = terms
+
+        clauses = []
+        phrase = ''
+        if len(words) > 1 and len(kept) > 1:
+            # The clause as written, stopwords included, with a little slop
+            phrase = f'"{" ".join(words)}"~{settings.planner_phrase_slop}'
+            clauses.append(f'({phrase})^{settings.planner_phrase_boost:g}')
+
+        distance = settings.search_fuzzy_distance
+        for term in kept:
+            clauses.append(f'{term.term}~{distance}' if term.action == FUZZY else term.term)
+
+        estimated_postings = None
+        if self.vocabulary is not None:
+            estimated_postings = sum(term.postings or 0 for term in kept)
+            if phrase:
+                estimated_postings += sum(self.vocabulary.frequency(word) for word in words)
+
+        return QueryPlan(
+            query=query,
+            search=' OR '.join(clauses),
+            terms=terms,
+            phrase=phrase,
+            estimated_postings=estimated_postings,
+            expanded_terms=sum(term.expansions for term in kept)
+        )
+
+def main(argv: List[str] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description='Build index vocabularies and inspect query plans.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Build vocabulary files from the configured indexes')
+    build.add_argument('--max-docs', type=int, default=20000, help='Documents to sample per index')
+    plan = commands.add_parser('plan', help='Show the planned query for each index')
+    plan.add_argument('query', help='Query to plan')
+    args = parser.parse_args(argv)
+
+    from .env_loader import load_env
+    from .search_operations import SearchOperations
+
+    load_env()
+    settings = get_settings()
+    for index_name in settings.search_indexes:
+        if args.command == 'build':
+            client = SearchOperations(settings.search_endpoint, index_name, settings.search_api_key)
+            client.wait_for_schema()
+            retrievable = getattr(client, 'retrievable_fields', [])
+            fields = [name for name in getattr(client, 'text_fields', []) if name in retrievable]
+            vocabulary = Vocabulary.build(client, fields or ['content'], max_docs=args.max_docs)
+            path = settings.planner_vocabulary_path.replace('{index}', index_name)
+            vocabulary.save(path)
+            print(f'{index_name}: {vocabulary.doc_count} documents, {len(vocabulary)} terms -> {path}')
+        else:
+            planned = QueryPlanner.for_index(index_name, settings).plan(args.query, settings, expand=True)
+            print(f'{index_name}:')
+            print(json.dumps(planned.to_dict(), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Sampled recorder for production search requests."""
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from .config import Settings
+from .utils import normalize_query
+
+logger = logging.getLogger(__name__)
+
+class QueryRecorder:
+    """Append sampled search requests to a rotating JSONL file.
+
+    Records are queued in memory and written by a background thread, so
+    the request path never blocks on disk I/O. When the queue is full the
+    record is dropped and counted instead.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0, max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 3, queue_size: int = 1000, max_total_bytes: int = 100 * 1024 * 1024):
+        """Initialize the recorder.
+
+        Args:
+            path (str): Output file; ``{pid}`` is replaced with the process id
+            sample_rate (float): Fraction of requests to record (0.0 - 1.0)
+            max_bytes (int): Size at which the file is rotated
+            backup_count (int): Number of rotated files to keep
+            queue_size (int): Maximum number of records waiting to be written
+            max_total_bytes (int): Cap on all recordings matching ``path`` across
+                processes, including files left behind by restarted workers
+        """
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._applied = None
+        self.configure(path, sample_rate, max_bytes, backup_count, max_total_bytes)
+
+        self._thread = threading.Thread(target=self._run, name='query-recorder', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        logger.info(f'Recording {self.sample_rate:.0%} of search requests to {self.path}')
+
+    def configure(self, path: str, sample_rate: float, max_bytes: int, backup_count: int,
+                  max_total_bytes: int):
+        """Apply output and limit settings; see :meth:`__init__` for the arguments."""
+        self.path = path.replace('{pid}', str(os.getpid()))
+        # Files of every worker, current and rotated
+        self.pattern = path.replace('{pid}', '*') + '*'
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.max_total_bytes = max_total_bytes
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._prune()
+
+    @staticmethod
+    def _settings_values(settings: Settings) -> tuple:
+        """Arguments for :meth:`configure` taken from the service settings."""
+        return (settings.record_path, settings.record_sample_rate, settings.record_max_bytes,
+                settings.record_backups, settings.record_max_total_bytes)
+
+    def apply_settings(self, settings: Settings):
+        """Follow reloaded settings, reconfiguring only when they changed."""
+        values = self._settings_values(settings)
+        if values != self._applied:
+            self.configure(*values)
+            self._applied = values
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'QueryRecorder':
+        """Create a recorder from the service settings."""
+        recorder = cls(
+            path=settings.record_path,
+            sample_rate=settings.record_sample_rate,
+            max_bytes=settings.record_max_bytes,
+            backup_count=settings.record_backups,
+            max_total_bytes=settings.record_max_total_bytes
+        )
+        recorder._applied = cls._settings_values(settings)
+        return recorder
+
+    def should_record(self) -> bool:
+        """Decide whether the current request is sampled."""
+        return not self._closed and random.random() < self.sample_rate
+
+    def record(self, query: str, options: Dict, timings: Dict, result_count: int,
+               cache: Optional[Dict] = None) -> bool:
+        """Queue a request record without blocking.
+
+        Returns:
+            bool: True if the record was queued, False if it was dropped
+        """
+        entry = {
+            'ts': time.time(),
+            'query': normalize_query(query),
+            'options': options,
+            'timings': {stage: round(ms, 3) for stage, ms in timings.items()},
+            'result_count': result_count,
+            'cache': cache or {}
+        }
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logger.warning(f'Query recorder queue full, {self.dropped} records dropped')
+            return False
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        """Writer loop running on the background thread."""
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            try:
+                self._write(json.dumps(entry, separators=(',', ':')) + '\n')
+            except Exception as e:
+                logger.error(f'Error writing query record: {str(e)}')
+
+    def _write(self, line: str):
+        """Append a line, rotating the file first if it would exceed max_bytes."""
+        data = line.encode('utf-8')
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, 'ab') as f:
+            f.write(data)
+
+    def _rotate(self):
+        """Shift path -> path.1 -> path.2 ..., discarding the oldest file."""
+        if self.backup_count <= 0:
+            os.remove(self.path)
+        else:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f'{self.path}.{i}'
+                if os.path.exists(src):
+                    os.replace(src, f'{self.path}.{i + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        self._prune()
+
+    def _prune(self):
+        """Delete the oldest recordings of any worker beyond max_total_bytes."""
+        if self.max_total_bytes <= 0:
+            return
+        files = []
+        for path in glob.glob(self.pattern):
+            if os.path.abspath(path) == os.path.abspath(self.path):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        try:
+            total = os.path.getsize(self.path)
+        except OSError:
+            total = 0
+        total += sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_total_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                logger.info(f'Removed old query recording {path}')
+            except OSError:
+                pass
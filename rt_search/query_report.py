@@ -0,0 +1,115 @@
+"""Summarize recorded search requests.
+
+Usage:
+    python -m rt_search.query_report logs/queries-*.jsonl* [--top 20]
+"""
+import argparse
+import glob
+import json
+import logging
+import math
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+def iter_records(paths: Iterable[str]) -> Iterator[Dict]:
+    """Yield records from recorder files, expanding glob patterns."""
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            logger.warning(f'Skipping malformed record in {path}')
+            except OSError as e:
+                logger.error(f'Cannot read {path}: {str(e)}')
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+def summarize(records: Iterable[Dict], top: int = 20) -> Dict:
+    """Build query frequency and per-stage latency statistics."""
+    queries = Counter()
+    timings: Dict[str, List[float]] = {}
+    cache_hits = Counter()
+    total = 0
+
+    for record in records:
+        total += 1
+        queries[record.get('query', '')] += 1
+        for stage, ms in (record.get('timings') or {}).items():
+            timings.setdefault(stage, []).append(float(ms))
+        for name, hit in (record.get('cache') or {}).items():
+            if hit:
+                cache_hits[name] += 1
+
+    latency = {}
+    for stage, values in timings.items():
+        values.sort()
+        latency[stage] = {
+            'count': len(values),
+            'p50': percentile(values, 50),
+            'p90': percentile(values, 90),
+            'p99': percentile(values, 99),
+            'max': values[-1]
+        }
+
+    return {
+        'total': total,
+        'distinct_queries': len(queries),
+        'top_queries': queries.most_common(top),
+        'latency_ms': latency,
+        'cache_hit_rate': {name: hits / total for name, hits in cache_hits.items()} if total else {}
+    }
+
+def format_report(summary: Dict) -> str:
+    """Render a summary as plain text."""
+    lines = [
+        f'Requests: {summary["total"]}',
+        f'Distinct queries: {summary["distinct_queries"]}',
+        '',
+        'Top queries:'
+    ]
+    total = summary['total'] or 1
+    for query, count in summary['top_queries']:
+        lines.append(f'  {count:6d} {count / total:6.1%}  {query}')
+
+    lines += ['', 'Latency (ms):', f'  {"stage":<12} {"count":>7} {"p50":>9} {"p90":>9} {"p99":>9} {"max":>9}']
+    for stage, stats in sorted(summary['latency_ms'].items()):
+        lines.append(
+            f'  {stage:<12} {stats["count"]:>7} {stats["p50"]:>9.1f} {stats["p90"]:>9.1f} '
+            f'{stats["p99"]:>9.1f} {stats["max"]:>9.1f}'
+        )
+
+    if summary['cache_hit_rate']:
+        lines += ['', 'Cache hit rate:']
+        for name, rate in sorted(summary['cache_hit_rate'].items()):
+            lines.append(f'  {name:<12} {rate:6.1%}')
+    return '\n'.join(lines)
+
+def main(argv: List[str] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description='Summarize recorded search requests.')
+    parser.add_argument('paths', nargs='+', help='Recorder files or glob patterns')
+    parser.add_argument('--top', type=int, default=20, help='Number of top queries to show')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args(argv)
+
+    summary = summarize(iter_records(args.paths), top=args.top)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_report(summary))
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
 """Process and transform search results."""
 import json
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from .models import SearchResult
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +15,8 @@ def extract_filepath(item: Dict) -> Dict:
         logger.info(f'{key}: {value}')
     
     # Log the raw item for debugging
-    logger.info(f'Raw search result item: {json.dumps(item, indent=2)}')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Raw search result item: %s', json.dumps(item, indent=2))
     
     # Initialize result with all possible fields
     result = {
@@ -96,7 +99,7 @@ def extract_filepath(item: Dict) -> Dict:
     print('No filename found in any field')
     return result
 
-def transform_result(item: Dict, idx: int) -> Dict:
+def transform_result(item: Dict, idx: int) -> SearchResult:
     """Transform a single search result."""
     # Extract required fields with validation
     content = str(item.get('content', ''))
@@ -124,34 +127,34 @@ def transform_result(item: Dict, idx: int) -> Dict:
         filename = content_preview
     
     # Combine all fields into result
-    result = {
-        'content': highlighted_content,  # Keep the highlighted content
-        'context': context,
-        'relevance': float(score),
-        'summary': caption or context[:200] + '...' if context else '',
-        'filename': filename,
-        'filepath': filepath_info['filepath'],
-        'metadata_storage_path': filepath_info['metadata_storage_path'],
-        'metadata_storage_name': filepath_info['metadata_storage_name'],
-        'url': filepath_info['url']
-    }
-    
-    logger.info(f'\nTransformed result {idx + 1}:')
-    logger.info(f'Result: {json.dumps(result, indent=2)}')
+    result = SearchResult(
+        content=highlighted_content,  # Keep the highlighted content
+        context=context,
+        relevance=float(score),
+        caption=caption or '',
+        filename=filename,
+        filepath=filepath_info['filepath'],
+        metadata_storage_path=filepath_info['metadata_storage_path'],
+        metadata_storage_name=filepath_info['metadata_storage_name'],
+        url=filepath_info['url']
+    )
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Transformed result %d: %r', idx + 1, result)
     
     # Additional debug logging
-    logger.info(f'Filename in result: {result["filename"]}')
-    logger.info(f'Metadata storage name: {result["metadata_storage_name"]}')
-    logger.info(f'Filepath: {result["filepath"]}')
+    logger.info(f'Filename in result: {result.filename}')
+    logger.info(f'Metadata storage name: {result.metadata_storage_name}')
+    logger.info(f'Filepath: {result.filepath}')
     
     print(f'Processing result {idx + 1}:')
-    print(f'Filename: {result["filename"]}')
-    print(f'Storage name: {result["metadata_storage_name"]}')
-    print(f'Filepath: {result["filepath"]}')
+    print(f'Filename: {result.filename}')
+    print(f'Storage name: {result.metadata_storage_name}')
+    print(f'Filepath: {result.filepath}')
     
     return result
 
-def process_results(results: Dict) -> List[Dict]:
+def process_results(results: Dict) -> List[SearchResult]:
     """Process and transform search results."""
     if not isinstance(results, dict):
         logger.error(f'Expected dict response, got {type(results)}')
@@ -178,3 +181,34 @@ def process_results(results: Dict) -> List[Dict]:
         logger.info(f'First result example: {transformed[0]}')
     
     return transformed
+
+def group_by_document(results: List[SearchResult], limit: Optional[int] = None,
+                      max_chunks: Optional[int] = None) -> List[SearchResult]:
+    """Collapse hits from the same source document.
+    
+    Results must be ordered best first. The first hit of each document is kept
+    and later hits are attached to it as ``chunks``.
+    
+    Args:
+        results (list): Ranked search results
+        limit (int, optional): Maximum number of documents to return
+        max_chunks (int, optional): Maximum number of extra hits kept per document
+    """
+    grouped = []
+    by_document = {}
+    for result in results:
+        key = result.document_key()
+        best = by_document.get(key) if key else None
+        if best is None:
+            if limit is not None and len(grouped) >= limit:
+                continue
+            grouped.append(result)
+            if key:
+                by_document[key] = result
+        elif max_chunks is None or len(best.chunks or ()) < max_chunks:
+            if best.chunks is None:
+                best.chunks = []
+            best.chunks.append(result)
+    
+    logger.info(f'Grouped {len(results)} hits into {len(grouped)} documents')
+    return grouped
@@ -1,87 +1,186 @@
 """Search client module combining Azure Cognitive Search and OpenAI."""
 import logging
-from typing import Dict, List, Union
+import time
+from typing import Dict, Hashable, List, Optional, Union
+from .cache import SharedCache, TTLCache
 from .cognitive_search_client import CognitiveSearchClient
 from .openai_client import OpenAIClient
-from .config import get_required_search_vars
+from .config import Settings, get_settings
+from .models import SearchResponse
+from .multi_index import MultiIndexSearchClient
+from .result_processor import group_by_document
+from .utils import normalize_query
 
 logger = logging.getLogger(__name__)
 
+# Largest page Azure Cognitive Search returns
+MAX_TOP = 1000
+
+# Settings that change search results or summaries, and so are part of the cache key
+CACHE_KEY_SETTINGS = (
+    'search_indexes', 'search_top', 'search_minimum_coverage', 'search_fuzzy_distance',
+    'search_highlight_fields', 'search_fusion', 'search_rrf_k',
+    'search_group_overfetch', 'search_group_max_chunks', 'search_query_planner', 'planner_vocabulary_path', 'planner_rare_ratio', 'planner_common_ratio',
+    'planner_min_fuzzy_length', 'planner_phrase_slop', 'planner_phrase_boost',
+    'completion_max_tokens', 'completion_temperature', 'completion_top_p'
+)
+
 class SearchClient:
     def __init__(self):
         """Initialize the search client"""
         logger.info('Initializing SearchClient...')
         
-        # Get required variables
-        required_vars = get_required_search_vars()
+        settings = get_settings()
         
         # Log configuration (safely)
         logger.info('Search configuration:')
-        logger.info(f'Search endpoint: {required_vars["AZURE_AI_SEARCH_ENDPOINT"]}')
-        logger.info(f'Search index: {required_vars["AZURE_AI_SEARCH_INDEX"]}')
-        logger.info(f'OpenAI endpoint: {required_vars["AZURE_OPENAI_ENDPOINT"]}')
-        logger.info(f'OpenAI deployment: {required_vars["AZURE_OPENAI_DEPLOYMENT"]}')
+        logger.info(f'Search endpoint: {settings.search_endpoint}')
+        logger.info(f'Search index: {", ".join(settings.search_indexes)}')
+        logger.info(f'OpenAI endpoint: {settings.openai_endpoint}')
+        logger.info(f'OpenAI deployment: {settings.openai_deployment}')
         
-        # Initialize Cognitive Search client
-        logger.info('Initializing Cognitive Search client...')
-        self.cognitive_search_client = CognitiveSearchClient(
-            endpoint=required_vars['AZURE_AI_SEARCH_ENDPOINT'],
-            index_name=required_vars['AZURE_AI_SEARCH_INDEX'],
-            api_key=required_vars['AZURE_AI_SEARCH_API_KEY']
-        )
+        # Initialize Cognitive Search client, fanning out when several indexes are configured
+        if len(settings.search_indexes) > 1:
+            logger.info(f'Initializing multi-index search client for {len(settings.search_indexes)} indexes...')
+            self.cognitive_search_client = MultiIndexSearchClient(
+                endpoint=settings.search_endpoint,
+                index_names=settings.search_indexes,
+                api_key=settings.search_api_key
+            )
+        else:
+            logger.info('Initializing Cognitive Search client...')
+            self.cognitive_search_client = CognitiveSearchClient(
+                endpoint=settings.search_endpoint,
+                index_name=settings.search_indexes[0],
+                api_key=settings.search_api_key
+            )
         
         # Initialize OpenAI client
         logger.info('Initializing OpenAI client...')
         self.openai_client = OpenAIClient(
-            endpoint=required_vars['AZURE_OPENAI_ENDPOINT'],
-            deployment=required_vars['AZURE_OPENAI_DEPLOYMENT'],
-            api_key=required_vars['AZURE_OPENAI_API_KEY']
+            endpoint=settings.openai_endpoint,
+            deployment=settings.openai_deployment,
+            api_key=settings.openai_api_key
         )
         
+        # Cache of (results, summary) per normalized query
+        self.cache = TTLCache(max_entries=settings.cache_max_entries)
+        self._shared_cache: Optional[SharedCache] = None
+        
         logger.info('SearchClient initialization complete')
+
+    @property
+    def ready(self) -> bool:
+        """Whether the background index schema warmup has finished successfully."""
+        return self.cognitive_search_client.schema_ready
+
+    @property
+    def error(self) -> Optional[str]:
+        """Why the index schema warmup failed, while it is being retried."""
+        return self.cognitive_search_client.schema_error
             
-    def search_contract_language(self, query: str) -> Union[Dict, List[Dict]]:
-        """Search for contract language and get OpenAI completion"""
-        try:
-            # Execute search
+    def get_shared_cache(self, settings: Settings) -> SharedCache:
+        """Host-wide store of responses refreshed by the cache warmer."""
+        if self._shared_cache is None or self._shared_cache.directory != settings.warm_store_path:
+            self._shared_cache = SharedCache(settings.warm_store_path)
+        return self._shared_cache
+
+    @staticmethod
+    def cache_key(query: str, settings: Settings, group: Optional[bool] = None) -> Hashable:
+        """Cache key for a query under the current settings."""
+        if group is None:
+            group = settings.search_group_by_document
+        return ((normalize_query(query), group)
+                + tuple(getattr(settings, name) for name in CACHE_KEY_SETTINGS))
+
+    def search(self, query: str, stats: Optional[Dict] = None, use_cache: bool = True,
+               summarize: bool = True, group: Optional[bool] = None) -> SearchResponse:
+        """Search for contract language and summarize the hits
+
+        Args:
+            query (str): Search query
+            stats (dict, optional): Filled with per-stage timings in milliseconds
+                under ``timings`` and cache hit flags under ``cache``
+            use_cache (bool): Read from the response cache; False forces a refresh
+            summarize (bool): Generate an OpenAI summary of the hits
+            group (bool, optional): Collapse hits by source document; defaults to
+                ``search_group_by_document``
+
+        Returns:
+            SearchResponse: Results and summary; errors are raised
+        """
+        if stats is None:
+            stats = {}
+        timings = stats.setdefault('timings', {})
+        cache_flags = stats.setdefault('cache', {})
+        settings = get_settings()
+        if group is None:
+            group = settings.search_group_by_document
+        key = self.cache_key(query, settings, group)
+        if self.cache.max_entries != settings.cache_max_entries:
+            self.cache.resize(settings.cache_max_entries)
+
+        if use_cache and settings.cache_ttl > 0:
+            cached = self.cache.get(key)
+            if cached is None and settings.warm_enabled:
+                # Responses warmed by the warmer in another worker
+                entry = self.get_shared_cache(settings).get(key)
+                if entry is not None:
+                    cached, remaining = entry
+                    self.cache.set(key, cached, min(remaining, settings.cache_ttl))
+                cache_flags['shared'] = entry is not None
+            cache_flags['response'] = cached is not None
+            if cached is not None:
+                results, completion = cached
+                return SearchResponse(summary=completion, results=results, timings=timings)
+
+        # Execute search
+        start = time.perf_counter()
+        if group:
+            # Fetch extra hits so that grouping can still fill search_top documents
+            fetch = min(MAX_TOP, settings.search_top * max(1, settings.search_group_overfetch))
+            search_results = self.cognitive_search_client.search(query, top=fetch)
+            search_results = group_by_document(
+                search_results, limit=settings.search_top, max_chunks=settings.search_group_max_chunks
+            )
+        else:
             search_results = self.cognitive_search_client.search(query)
-            
-            if not search_results:
-                logger.warning('No search results found')
-                return []
-            
-            # Extract content from results
-            content = []
-            for result in search_results:
-                if isinstance(result, dict) and 'content' in result:
-                    content.append(result['content'])
-            
-            # Get completion from OpenAI
-            context = '\n'.join(content)
-            completion = self.openai_client.get_completion(query, context)
-            
-            # Return formatted results with all fields
-            formatted_results = []
-            for idx, result in enumerate(search_results):
-                # Start with all fields from the result
-                formatted_result = dict(result)
-                
-                # Add or update specific fields
-                formatted_result.update({
-                    'content': result.get('content', ''),
-                    'context': result.get('context', ''),
-                    'relevance': result.get('@search.score', 0),
-                    'summary': completion if idx == 0 else '',
-                    'filepath': result.get('filepath', ''),
-                    'metadata_storage_path': result.get('metadata_storage_path', ''),
-                    'metadata_storage_name': result.get('metadata_storage_name', ''),
-                    'url': result.get('url', '')
-                })
-                
-                formatted_results.append(formatted_result)
-            
-            return formatted_results
-            
+        timings['search'] = (time.perf_counter() - start) * 1000
+        
+        if not search_results:
+            logger.warning('No search results found')
+            return SearchResponse(timings=timings)
+        
+        if not summarize:
+            return SearchResponse(results=search_results, timings=timings)
+        
+        # Get completion from OpenAI
+        context = '\n'.join(result.content for result in search_results if result.content)
+        start = time.perf_counter()
+        completion = self.openai_client.get_completion(query, context)
+        timings['summary'] = (time.perf_counter() - start) * 1000
+        
+        # An empty summary means the completion failed; do not keep it around
+        if completion and settings.cache_ttl > 0:
+            self.cache.set(key, (search_results, completion), settings.cache_ttl)
+        
+        return SearchResponse(summary=completion, results=search_results, timings=timings)
+
+    def explain(self, query: str) -> List[Dict]:
+        """Planned Lucene query and cost estimate for each index."""
+        clients = getattr(self.cognitive_search_client, 'clients', [self.cognitive_search_client])
+        return [
+            dict(index=client._index_name, **client.plan_query(query, expand=True).to_dict())
+            for client in clients
+        ]
+
+    def search_contract_language(self, query: str, stats: Optional[Dict] = None) -> Union[Dict, List[Dict]]:
+        """Search for contract language and get OpenAI completion
+
+        Returns results in the legacy list format, or ``{'error': ...}`` on failure.
+        """
+        try:
+            return self.search(query, stats=stats).to_legacy()
         except Exception as e:
             logger.error(f'Search failed: {str(e)}')
             return {'error': str(e)}
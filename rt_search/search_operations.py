@@ -1,43 +1,92 @@
 """Search operations for Azure Cognitive Search."""
 import json
 import logging
-import re
-from typing import Dict, List
+import os
+from typing import Dict, Iterator, List, Optional
 
 import requests
 from .base_client import BaseSearchClient
+from .config import get_settings
+from .models import SearchResult
+from .query_planner import QueryPlan, QueryPlanner
 from .result_processor import process_results
+from .utils import clean_query
 
 logger = logging.getLogger(__name__)
 
+# Seconds a search waits for the background schema inspection
+SCHEMA_WAIT_TIMEOUT = 30
+
+# Largest skip Azure Cognitive Search accepts
+MAX_SKIP = 100000
+
 class SearchOperations(BaseSearchClient):
     """Search operations implementation."""
     
-    def search(self, query: str) -> List[Dict]:
-        """Execute a search query."""
+    _planner: Optional[QueryPlanner] = None
+    _planner_source = None
+    
+    def get_planner(self) -> QueryPlanner:
+        """Query planner for this index, reloaded when its vocabulary file changes."""
+        settings = get_settings()
+        path = settings.planner_vocabulary_path.replace('{index}', self._index_name)
+        try:
+            source = (path, os.path.getmtime(path))
+        except OSError:
+            source = (path, None)
+        if self._planner is None or self._planner_source != source:
+            self._planner = QueryPlanner.for_index(self._index_name, settings)
+            self._planner_source = source
+        return self._planner
+    
+    def plan_query(self, query: str, expand: bool = False) -> QueryPlan:
+        """Plan the Lucene query this index would run for a user query.
+
+        With ``expand`` the plan also counts fuzzy expansions, which is slow on
+        large vocabularies; searches plan without it.
+        """
+        return self.get_planner().plan(query, expand=expand)
+    
+    def search(self, query: str, top: Optional[int] = None) -> List[SearchResult]:
+        """Execute a search query.
+        
+        Args:
+            query (str): Search query
+            top (int, optional): Number of hits to fetch; defaults to ``search_top``
+        
+        Raises:
+            RuntimeError: If the request fails, is throttled or returns an error body
+        """
         logger.info(f'Searching for: {query}')
+        settings = get_settings()
         
         # Clean and process the query
         cleaned_query = query.strip()
         print(f'\nProcessing query: {cleaned_query}')
         
-        # Basic cleaning - only remove special characters
-        cleaned_query = re.sub(r'[^\w\s]', '', cleaned_query)
+        # Basic cleaning - only remove special characters, as the planner does
+        cleaned_query = clean_query(cleaned_query)
         print(f'Cleaned query: {cleaned_query}')
         
         # Split into terms for fuzzy search
         terms = cleaned_query.split()
         print(f'Search terms: {terms}')
         
-        # Build fuzzy search query
-        if terms:
+        # Build the Lucene query from the planner, or expand every term
+        if terms and settings.search_query_planner:
+            plan = self.plan_query(cleaned_query)
+            cleaned_query = plan.search
+            logger.info(f'Query plan: {json.dumps(plan.to_dict())}')
+        elif terms:
             # Add fuzzy search for each term
-            fuzzy_terms = [f'{term}~1' for term in terms]
+            fuzzy_terms = [f'{term}~{settings.search_fuzzy_distance}' for term in terms]
             cleaned_query = ' OR '.join(fuzzy_terms)
             print(f'Fuzzy search query: {cleaned_query}')
         logger.info(f'Cleaned query: {cleaned_query}')
         
-        # Get fields from index inspection
+        # Get fields from index inspection, waiting for a warmup still in flight
+        if not self.wait_for_schema(SCHEMA_WAIT_TIMEOUT):
+            logger.warning(f'Index schema for {self._index_name} not ready, using default fields')
         select_fields = self.retrievable_fields if hasattr(self, 'retrievable_fields') else ['*']
         search_fields = self.searchable_fields if hasattr(self, 'searchable_fields') else ['content', 'title']
         
@@ -49,16 +98,16 @@ class SearchOperations(BaseSearchClient):
         search_params = {
             'search': cleaned_query,
             'queryType': 'full',  # Use full Lucene query syntax for fuzzy search
-            'top': 50,
+            'top': top or settings.search_top,
             'select': ','.join(select_fields),  # Use all retrievable fields
             'searchFields': ','.join(search_fields),  # Use all searchable fields
             'searchMode': 'any',  # Allow any term to match for fuzzy search
             'count': True,
             'orderby': 'search.score() desc',
-            'highlight': 'content,title',  # Highlight matches in both content and title
+            'highlight': ','.join(settings.search_highlight_fields),
             'highlightPreTag': '<mark>',
             'highlightPostTag': '</mark>',
-            'minimumCoverage': 25  # Allow more partial matches
+            'minimumCoverage': settings.search_minimum_coverage  # Allow more partial matches
         }
         
         # Log search configuration
@@ -96,9 +145,17 @@ class SearchOperations(BaseSearchClient):
             print('Response headers:', dict(response.headers))
             print('Response content:', response.text)
             
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f'Search on index {self._index_name} failed with status {response.status_code}: '
+                    f'{response.text[:200]}'
+                )
+            
             try:
                 # Parse and log raw response
                 results = response.json()
+                if isinstance(results, dict) and 'error' in results:
+                    raise RuntimeError(f'Search on index {self._index_name} returned an error: {results["error"]}')
                 logger.info(f'Got {len(results.get("value", []))} results')
                 
                 # Log raw search results
@@ -130,22 +187,80 @@ class SearchOperations(BaseSearchClient):
                 logger.info('\nProcessed results:')
                 for idx, result in enumerate(processed_results):
                     logger.info(f'\nProcessed result {idx + 1}:')
-                    logger.info('Available fields: ' + ', '.join(result.keys()))
-                    logger.info(f'filename: {result.get("filename")}')
-                    logger.info(f'filepath: {result.get("filepath")}')
-                    logger.info(f'metadata_storage_path: {result.get("metadata_storage_path")}')
+                    logger.info(f'filename: {result.filename}')
+                    logger.info(f'filepath: {result.filepath}')
+                    logger.info(f'metadata_storage_path: {result.metadata_storage_path}')
                 
                 return processed_results
                 
             except ValueError as e:
                 logger.error(f'Failed to parse JSON response: {e}')
                 logger.error(f'Raw response text: {response.text[:1000]}')
-                return []
+                raise RuntimeError(f'Search on index {self._index_name} returned invalid JSON') from e
         
         except Exception as e:
             logger.error(f'Search failed: {str(e)}')
             logger.error(f'Exception type: {type(e).__name__}')
-            if isinstance(e, requests.exceptions.RequestException) and hasattr(e, 'response'):
+            if isinstance(e, requests.exceptions.RequestException) and getattr(e, 'response', None) is not None:
                 logger.error(f'Response status: {e.response.status_code}')
                 logger.error(f'Response text: {e.response.text[:1000]}')
-            return []
+            raise
+    
+    def fetch_documents(self, fields: List[str], top: int = 1000, skip: int = 0,
+                        after: Optional[str] = None) -> List[Dict]:
+        """Fetch one page of documents, returning only the given fields.
+        
+        When the index key can be sorted and filtered, pages are ordered by key
+        and ``after`` starts the page past a key; otherwise ``skip`` is used and
+        the order between pages is not guaranteed.
+        """
+        params = {
+            'search': '*',
+            'select': ','.join(fields),
+            'top': top
+        }
+        if getattr(self, 'key_pageable', False):
+            params['orderby'] = f'{self.key_field} asc'
+            if after is not None:
+                escaped = after.replace("'", "''")
+                params['filter'] = f"{self.key_field} gt '{escaped}'"
+        else:
+            params['skip'] = skip
+        response = requests.post(
+            self.search_url,
+            headers={
+                'Content-Type': 'application/json',
+                'api-key': self._auth
+            },
+            json=params
+        )
+        response.raise_for_status()
+        return response.json().get('value', [])
+    
+    def iter_documents(self, fields: List[str], max_docs: int, page_size: int = 1000) -> Iterator[List[Dict]]:
+        """Yield pages of documents, up to max_docs in total.
+        
+        Pages by key range when the index key is sortable and filterable, so
+        every document is read once. Otherwise falls back to ``skip`` paging,
+        which Azure limits to the first ``MAX_SKIP`` documents.
+        """
+        self.wait_for_schema()
+        key_field = getattr(self, 'key_field', None)
+        key_paging = getattr(self, 'key_pageable', False)
+        if key_paging:
+            fields = list(fields) if key_field in fields else list(fields) + [key_field]
+        elif max_docs > MAX_SKIP:
+            logger.warning(f'Index key of {self._index_name} is not sortable and filterable; '
+                           f'reading at most {MAX_SKIP} documents with skip paging')
+            max_docs = MAX_SKIP
+        
+        fetched = 0
+        after = None
+        while fetched < max_docs:
+            page = self.fetch_documents(fields, top=min(page_size, max_docs - fetched), skip=fetched, after=after)
+            if not page:
+                return
+            yield page
+            fetched += len(page)
+            if key_paging:
+                after = str(page[-1][key_field])
@@ -0,0 +1,105 @@
+"""Measure package import and application startup time.
+
+Each measurement runs in a fresh interpreter. The command exits non-zero when
+a budget is exceeded or when ``import rt_search`` loads a heavy client library,
+so it can guard cold start in CI or before a deploy.
+
+Usage:
+    python -m rt_search.startup_benchmark [--runs 5] [--import-budget-ms 50] [--app-budget-ms 1500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from .config import REQUIRED_VARS
+
+# Libraries that must not load until a client is used
+HEAVY_MODULES = ('openai', 'requests', 'dotenv')
+
+_IMPORT_PACKAGE = '''
+import json, os, sys, time
+start = time.perf_counter()
+import rt_search
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+''' % (HEAVY_MODULES,)
+
+_IMPORT_APP = '''
+import json, os, sys, time
+start = time.perf_counter()
+import wsgi
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "loaded": []}), flush=True)
+os._exit(0)
+'''
+
+def _project_root() -> str:
+    """Directory containing the rt_search package and wsgi.py."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _run(code: str) -> Dict:
+    """Run a snippet in a fresh interpreter and parse its JSON output."""
+    env = dict(os.environ)
+    # Placeholders keep startup validation happy; nothing is contacted synchronously
+    for var in REQUIRED_VARS:
+        if not env.get(var):
+            env[var] = 'http://127.0.0.1:9' if 'ENDPOINT' in var else 'placeholder'
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=_project_root(),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'Benchmark process failed:\n{result.stderr[-2000:]}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def measure(code: str, runs: int) -> Dict:
+    """Median and worst time over several fresh runs."""
+    samples: List[float] = []
+    loaded = set()
+    for _ in range(runs):
+        result = _run(code)
+        samples.append(result['ms'])
+        loaded.update(result['loaded'])
+    return {
+        'median_ms': statistics.median(samples),
+        'max_ms': max(samples),
+        'loaded': sorted(loaded)
+    }
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description='Measure rt_search import and startup time.')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per measurement')
+    parser.add_argument('--import-budget-ms', type=float, default=50.0,
+                        help='Budget for the median time of import rt_search')
+    parser.add_argument('--app-budget-ms', type=float, default=1500.0,
+                        help='Budget for the median time to import the WSGI app')
+    args = parser.parse_args(argv)
+
+    failures = []
+    package = measure(_IMPORT_PACKAGE, args.runs)
+    print(f'import rt_search: median {package["median_ms"]:.1f} ms, max {package["max_ms"]:.1f} ms')
+    if package['median_ms'] > args.import_budget_ms:
+        failures.append(f'import rt_search exceeds {args.import_budget_ms:.0f} ms budget')
+    if package['loaded']:
+        failures.append(f'import rt_search loaded {", ".join(package["loaded"])}')
+
+    app = measure(_IMPORT_APP, args.runs)
+    print(f'wsgi app startup: median {app["median_ms"]:.1f} ms, max {app["max_ms"]:.1f} ms')
+    if app['median_ms'] > args.app_budget_ms:
+        failures.append(f'wsgi app startup exceeds {args.app_budget_ms:.0f} ms budget')
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
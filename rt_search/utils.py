@@ -13,6 +13,10 @@ def clean_query(query: str) -> str:
     cleaned = ' '.join(cleaned.split())
     return cleaned
 
+def normalize_query(query: str) -> str:
+    """Normalize a query so equivalent requests share cache and report entries."""
+    return clean_query(query).lower()
+
 def safe_str(value: Optional[str]) -> str:
     """Safely convert a value to string."""
     if value is None:
@@ -1,8 +1,17 @@
 """Flask application for the search API."""
+import hmac
 import logging
+import random
+import threading
+import time
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from rt_search import SearchClient, load_env
+from rt_search import load_env
+from rt_search.config import get_settings, start_settings_watcher
+from rt_search.models import ENVELOPE_VERSION, LEGACY_VERSION
+from rt_search.prewarm import CacheWarmer
+from rt_search.profiling import RequestProfiler
+from rt_search.query_recorder import QueryRecorder
 
 # Configure logging
 logging.basicConfig(
@@ -27,36 +36,101 @@ def add_header(response):
 def root():
     return app.send_static_file('index.html')
 
-# Global search client
+# Global search client, constructed on first use or by the startup warmup
 search_client = None
+_client_lock = threading.Lock()
+_client_error = None
+_warmed_up = threading.Event()
+_initialized = False
+
+# Background warmer for popular queries; idle unless warm_enabled is set
+cache_warmer = None
+
+# Optional sampled request recorder, created once recording is enabled
+query_recorder = None
+_recorder_lock = threading.Lock()
+
+# On-demand request profiler, created the first time a request is profiled
+request_profiler = None
+_profiler_lock = threading.Lock()
+
+def get_search_client():
+    """Return the search client, constructing it on first use."""
+    global search_client, _client_error
+    if search_client is None:
+        with _client_lock:
+            if search_client is None:
+                from rt_search import SearchClient
+                try:
+                    search_client = SearchClient()
+                    _client_error = None
+                except Exception as e:
+                    _client_error = str(e)
+                    raise
+    return search_client
+
+def _warm_up():
+    """Build the clients and load the OpenAI library off the request path."""
+    global cache_warmer
+    try:
+        logger.info('Warming up search client...')
+        client = get_search_client()
+        client.openai_client.client
+        logger.info('Search client warmup complete')
+        
+        cache_warmer = CacheWarmer(client)
+        cache_warmer.start()
+    except Exception as e:
+        logger.error(f'Search client warmup failed: {str(e)}')
+        logger.exception('Full traceback:')
+    finally:
+        _warmed_up.set()
 
 def init_app():
-    """Initialize the application."""
-    global search_client
+    """Initialize the application.
+
+    Configuration is validated synchronously; clients are built and the index
+    schema is inspected in the background, so this returns without network I/O.
+    """
+    global _initialized
+    if _initialized:
+        return app
     try:
         # Load environment variables
         logger.info('Loading environment variables...')
         load_env()
+        start_settings_watcher()
         
-        # Initialize search client
-        logger.info('Initializing search client...')
-        search_client = SearchClient()
+        # Initialize search client in the background
+        threading.Thread(target=_warm_up, name='search-warmup', daemon=True).start()
+        _initialized = True
         logger.info('Application initialized successfully')
+        return app
     except Exception as e:
         logger.error(f'Failed to initialize application: {str(e)}')
         logger.exception('Full traceback:')
         raise
 
-# Initialize the app
-init_app()
-
 @app.route('/api/search', methods=['POST'])
 def search():
-    """Handle search requests."""
+    """Handle search requests, profiling them when requested or sampled."""
+    if not should_profile():
+        return handle_search()
+    with get_request_profiler().profile('api-search') as profile:
+        response = app.make_response(handle_search())
+    if profile is not None:
+        response.headers['X-Profile-Id'] = profile.profile_id
+    return response
+
+def handle_search():
+    """Run a search request and build its response."""
     logger.info('Received search request')
+    start = time.perf_counter()
     try:
-        if search_client is None:
-            logger.error('Search client not initialized')
+        try:
+            client = get_search_client()
+        except Exception as e:
+            logger.error(f'Search client not initialized: {str(e)}')
             return jsonify({'error': 'Application not properly initialized'}), 500
         # Get query from request
         logger.info(f'Request data: {request.data}')
@@ -72,45 +146,131 @@ def search():
             logger.error(f'Invalid query format: {query}')
             return jsonify({'error': 'Invalid query format'}), 400
             
+        version = data.get('version', get_settings().response_version)
+        if version not in (LEGACY_VERSION, ENVELOPE_VERSION):
+            logger.error(f'Unsupported response version: {version}')
+            return jsonify({'error': f'Unsupported response version: {version}'}), 400
+            
+        group = data.get('group')
+        if group is not None and not isinstance(group, bool):
+            logger.error(f'Invalid group option: {group}')
+            return jsonify({'error': 'Invalid group option'}), 400
+            
+        chunk_content = data.get('chunk_content', False)
+        if not isinstance(chunk_content, bool):
+            logger.error(f'Invalid chunk_content option: {chunk_content}')
+            return jsonify({'error': 'Invalid chunk_content option'}), 400
+            
         # Execute search
         logger.info(f'Executing search with query: {query}')
-        results = search_client.search_contract_language(query)
+        stats = {}
+        try:
+            results = client.search(query, stats=stats, group=group)
+        except Exception as e:
+            logger.error(f'Search error: {str(e)}')
+            return jsonify({'error': str(e)}), 500
         
         # Log results details
-        if isinstance(results, list):
-            logger.info(f'Found {len(results)} results')
-            for idx, result in enumerate(results):
-                logger.info(f'Result {idx + 1}:')
-                logger.info(f'  Content length: {len(result.get("content", ""))}')
-                logger.info(f'  Relevance score: {result.get("relevance", 0)}')
-                if result.get('summary'):
-                    logger.info(f'  Has summary: Yes')
-        else:
-            logger.warning(f'Unexpected results type: {type(results)}')
-            if isinstance(results, dict):
-                logger.warning(f'Result keys: {list(results.keys())}')
+        logger.info(f'Found {len(results)} results')
+        for idx, result in enumerate(results.results):
+            logger.info(f'Result {idx + 1}:')
+            logger.info(f'  Content length: {len(result.content)}')
+            logger.info(f'  Relevance score: {result.relevance}')
+        if results.summary:
+            logger.info('  Has summary: Yes')
         
         # Return results
-        if isinstance(results, dict) and 'error' in results:
-            logger.error(f'Search error: {results["error"]}')
-            return jsonify({'error': results["error"]}), 500
-            
         if not results:
             logger.info('No results found')
-            return jsonify([])
-            
-        logger.info('Returning results successfully')
-        return jsonify(results)
+        else:
+            logger.info('Returning results successfully')
+        body = results.to_version(version, chunk_content)
+        if data.get('explain') and version == ENVELOPE_VERSION:
+            body['plan'] = client.explain(query)
+        response = jsonify(body)
+        
+        record_request(query, data, stats, len(results), start)
+        return response
         
     except Exception as e:
         logger.error(f'Error processing request: {str(e)}')
         logger.exception('Full traceback:')
         return jsonify({'error': str(e)}), 500
 
+def should_profile() -> bool:
+    """Whether this request is profiled.
+
+    Requests are profiled when they carry the configured token in the
+    ``X-Profile`` header, or at random at ``profile_sample_rate``.
+    """
+    settings = get_settings()
+    token = settings.profile_token
+    if token:
+        header = request.headers.get('X-Profile')
+        if header and hmac.compare_digest(header.encode(), token.encode()):
+            return True
+    return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+def get_request_profiler():
+    """Return the request profiler, constructing it from settings on first use."""
+    global request_profiler
+    if request_profiler is None:
+        with _profiler_lock:
+            if request_profiler is None:
+                settings = get_settings()
+                request_profiler = RequestProfiler(
+                    directory=settings.profile_dir,
+                    max_profiles=settings.profile_max_profiles,
+                    interval_ms=settings.profile_interval_ms
+                )
+    else:
+        # Follow reloaded settings
+        settings = get_settings()
+        request_profiler.directory = settings.profile_dir
+        request_profiler.max_profiles = settings.profile_max_profiles
+        request_profiler.interval = settings.profile_interval_ms / 1000.0
+    return request_profiler
+
+def get_query_recorder():
+    """Return the query recorder, or None while recording is disabled."""
+    global query_recorder
+    settings = get_settings()
+    if settings.record_sample_rate <= 0:
+        return None
+    if query_recorder is None:
+        with _recorder_lock:
+            if query_recorder is None:
+                query_recorder = QueryRecorder.from_settings(settings)
+    # Output path and limits follow reloaded settings
+    query_recorder.apply_settings(settings)
+    return query_recorder
+
+def record_request(query: str, data: dict, stats: dict, result_count: int, start: float):
+    """Hand a sampled request to the query recorder, if enabled."""
+    recorder = get_query_recorder()
+    if recorder is None or not recorder.should_record():
+        return
+    timings = dict(stats.get('timings', {}))
+    timings['total'] = (time.perf_counter() - start) * 1000
+    options = {key: value for key, value in data.items() if key != 'query'}
+    recorder.record(query, options, timings, result_count, stats.get('cache'))
+
 @app.route('/health', methods=['GET'])
 def health():
-    """Health check endpoint."""
-    return jsonify({'status': 'healthy'})
+    """Health check endpoint.
+
+    Reports ``ready`` once the clients are built and index schemas inspected,
+    ``starting`` while the warmup is running and ``error`` if it failed. A failed
+    schema inspection is retried in the background and reported as ``error``
+    until it succeeds.
+    """
+    if _warmed_up.is_set() and search_client is not None and search_client.ready:
+        return jsonify({'status': 'ready'})
+    if _client_error is not None:
+        return jsonify({'status': 'error', 'error': _client_error}), 503
+    if search_client is not None and search_client.error is not None:
+        return jsonify({'status': 'error', 'error': search_client.error}), 503
+    return jsonify({'status': 'starting'}), 503
 
 @app.route('/test', methods=['GET'])
 def test():
@@ -119,6 +279,7 @@ def test():
     return jsonify({'message': 'Test endpoint working'})
 
 if __name__ == '__main__':
+    init_app()
     try:
         app.run(host='127.0.0.1', port=8000, debug=True)
     except KeyboardInterrupt:
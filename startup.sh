@@ -4,4 +4,8 @@
 pip install -r requirements.txt
 
 # Start Gunicorn
-python -m gunicorn --bind=0.0.0.0:8000 --workers=4 --threads=2 --timeout=600 --log-level info --access-logfile - --error-logfile - wsgi:app
+# Sizing is read by gunicorn.conf.py, which also applies RT_SEARCH_SETTINGS_FILE overrides on SIGHUP
+export GUNICORN_WORKERS=${GUNICORN_WORKERS:-4}
+export GUNICORN_THREADS=${GUNICORN_THREADS:-2}
+export GUNICORN_TIMEOUT=${GUNICORN_TIMEOUT:-600}
+python -m gunicorn -c gunicorn.conf.py wsgi:app
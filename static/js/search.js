@@ -48,7 +48,7 @@ async function testSearch() {
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({ query })
+            body: JSON.stringify({ query, version: 2 })
         });
         
         if (!response.ok) {
@@ -60,27 +60,26 @@ async function testSearch() {
             throw new Error(data.error);
         }
         
-        if (!data || !Array.isArray(data)) {
+        if (!data || !Array.isArray(data.results)) {
             throw new Error('Invalid response format from server');
         }
         
         // Debug log the data
         console.log('Search results:', data);
-        if (data && data.length > 0) {
-            console.log('First result fields:', Object.keys(data[0]));
-            console.log('First result:', data[0]);
+        if (data.results.length > 0) {
+            console.log('First result fields:', Object.keys(data.results[0]));
+            console.log('First result:', data.results[0]);
         }
 
         // Update grid data
-        gridApi.setRowData(data);
+        gridApi.setRowData(data.results);
         gridApi.sizeColumnsToFit();
         
         // Update summary if available
-        const firstRow = data[0];
-        if (firstRow && firstRow.summary) {
+        if (data.summary) {
             const summaryDiv = document.getElementById('searchSummary');
             const summaryContent = document.getElementById('summaryContent');
-            summaryContent.textContent = firstRow.summary;
+            summaryContent.textContent = data.summary;
             summaryDiv.style.display = 'block';
         } else {
             document.getElementById('searchSummary').style.display = 'none';